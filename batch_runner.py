@@ -0,0 +1,16 @@
+from concurrent.futures import ProcessPoolExecutor
+from process_each_folder import solve_instance
+
+# Solve instances (any iterable, e.g. a lazy loader) in a process pool; results keep the input order
+def solve_batch(instances, max_workers=None, seed=None, **solve_options):
+    def instance_seed(k):
+        return None if seed is None else seed + k
+
+    if max_workers == 1:  # Serial, in this process
+        return [solve_instance(instance, seed=instance_seed(k), **solve_options)
+                for k, instance in enumerate(instances)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(solve_instance, instance, seed=instance_seed(k), **solve_options)
+                   for k, instance in enumerate(instances)]
+        return [future.result() for future in futures]
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from dataset_loader import iter_zip_instances
+from ga_algo import genetic_algorithm_with_precedence_and_zoning, fitness_with_robot
+from fitness_cache import FitnessCache
+from profiling import StageTimer
+
+DATASETS = (
+    "./PALBP_DATASET/PALBP_DATASET/small/PALBP-data-sets.zip",
+    "./PALBP_DATASET/PALBP_DATASET/original/PALBP-data-sets.zip"
+)
+STAGES = ('init', 'fitness', 'selection', 'crossover', 'mutation', 'zoning')
+
+# One benchmark cell: the GA on one instance with a fixed seed, with a fitness cache of fitness_cache_size
+# entries (0 for none) as solve_instance uses by default
+def benchmark_run(instance, seed, pop_size=10, generations=50, trace_memory=False, fitness_cache_size=4096):
+    rng = random.Random(seed)
+    instance = instance.with_random_station_assignments(rng)
+    timer = StageTimer()
+    fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size else None
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    best_solution = genetic_algorithm_with_precedence_and_zoning(instance, pop_size, generations, fitness_cache,
+                                                                 timer=timer, rng=rng)
+    wall_time = time.perf_counter() - start
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    evaluations = timer.counters.get('evaluations', 0)
+    return {
+        'seed': seed,
+        'wall_time': wall_time,
+        'stage_times': {name: timer.stage_times.get(name, 0.0) for name in STAGES},
+        'evaluations': evaluations,
+        'evaluations_per_second': evaluations / wall_time if wall_time else 0.0,
+        'peak_memory_bytes': peak_memory,
+        'best_cycle_time': float(fitness_with_robot(best_solution, instance.task_times, instance.layout))
+    }
+
+# Fixed reference workload with the GA's mix of Python loops and small NumPy calls. Timed next to every run,
+# it turns wall time into machine-independent units, so load on a shared host does not read as a regression
+def reference_time():
+    start = time.perf_counter()
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+    values = np.arange(2000.0)
+    for _ in range(200):
+        values = np.sort(values[::-1]) + 1
+    return time.perf_counter() - start
+
+# Repeated untraced runs of one seed (all with the same result, as the seed fixes it): at least repeats runs,
+# and more until min_time seconds have been spent on them. Keeps the run of median time in reference units
+def typical_run(instance, seed, pop_size, generations, repeats=5, min_time=0.5, fitness_cache_size=4096):
+    runs, spent = [], 0.0
+    while len(runs) < max(repeats, 1) or spent < min_time:
+        before = reference_time()
+        run = benchmark_run(instance, seed, pop_size, generations, fitness_cache_size=fitness_cache_size)
+        run['reference_time'] = min(before, reference_time())
+        runs.append(run)
+        spent += run['wall_time']
+    runs.sort(key=lambda run: run['wall_time'] / run['reference_time'])
+    return runs[len(runs) // 2]
+
+# Every instance x seed. Runs of a short instance take tens of milliseconds, so a single timing is mostly noise:
+# each instance gets an untimed warm-up run and every seed keeps its typical_run. Peak memory comes from a
+# traced rerun of the same seed
+def run_benchmark(zip_paths=DATASETS, instance_names=None, seeds=(0, 1, 2), pop_size=10, generations=50,
+                  measure_memory=True, repeats=5, min_time=0.5, fitness_cache_size=4096):
+    results = {}
+    for zip_path in zip_paths:
+        dataset = os.path.basename(os.path.dirname(os.path.abspath(zip_path)))
+        for instance in iter_zip_instances(zip_path, instance_names):
+            benchmark_run(instance, seeds[0], pop_size, generations, fitness_cache_size=fitness_cache_size)  # Warm-up
+            runs = []
+            for seed in seeds:
+                run = typical_run(instance, seed, pop_size, generations, repeats, min_time, fitness_cache_size)
+                if measure_memory:
+                    run['peak_memory_bytes'] = benchmark_run(instance, seed, pop_size, generations, trace_memory=True,
+                                                             fitness_cache_size=fitness_cache_size)['peak_memory_bytes']
+                runs.append(run)
+            results[f"{dataset}/{instance.name}"] = {'runs': runs, 'summary': summarize(runs)}
+            summary = results[f"{dataset}/{instance.name}"]['summary']
+            print(f"{dataset}/{instance.name}: {summary['median_wall_time']:.3f}s, "
+                  f"{summary['evaluations_per_second']:.0f} evals/s, best cycle time {summary['best_cycle_time']}")
+    return results
+
+# Per-instance figures compared against the baseline
+def summarize(runs):
+    total_time = sum(run['wall_time'] for run in runs)
+    total_reference_units = sum(run['wall_time'] / run['reference_time'] for run in runs)
+    memory = [run['peak_memory_bytes'] for run in runs if run['peak_memory_bytes'] is not None]
+    return {
+        'median_wall_time': float(np.median([run['wall_time'] for run in runs])),
+        'stage_times': {name: sum(run['stage_times'][name] for run in runs) / len(runs) for name in STAGES},
+        'evaluations_per_second': sum(run['evaluations'] for run in runs) / total_time if total_time else 0.0,
+        'evaluations_per_reference': (sum(run['evaluations'] for run in runs) / total_reference_units
+                                      if total_reference_units else 0.0),
+        'peak_memory_bytes': max(memory) if memory else None,
+        'best_cycle_time': min(run['best_cycle_time'] for run in runs),
+        'mean_best_cycle_time': float(np.mean([run['best_cycle_time'] for run in runs]))
+    }
+
+# Regressions beyond the tolerances: throughput may drop by throughput_tolerance, mean best cycle time may grow by
+# quality_tolerance. Throughput is compared in reference units, or in evals/s against a baseline without them
+def compare_to_baseline(results, baseline, throughput_tolerance=0.2, quality_tolerance=0.02):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        current, reference = result['summary'], baseline[key]
+        metric, unit = ('evaluations_per_reference', 'evals/reference') if 'evaluations_per_reference' in reference \
+            else ('evaluations_per_second', 'evals/s')
+        if current[metric] < reference[metric] * (1 - throughput_tolerance):
+            regressions.append(f"{key}: throughput {current[metric]:.0f} {unit}, baseline {reference[metric]:.0f}")
+        if current['mean_best_cycle_time'] > reference['mean_best_cycle_time'] * (1 + quality_tolerance):
+            regressions.append(f"{key}: mean best cycle time {current['mean_best_cycle_time']:.2f}, "
+                               f"baseline {reference['mean_best_cycle_time']:.2f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the GA with fixed seeds against a stored baseline")
+    parser.add_argument("--zip", action="append", default=None, help="dataset ZIP (repeatable, default: small and original)")
+    parser.add_argument("--instances", nargs="+", default=None, help="only these instances")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--pop-size", type=int, default=10)
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--output", default=None, help="write the full per-run results as JSON")
+    parser.add_argument("--throughput-tolerance", type=float, default=0.2)
+    parser.add_argument("--quality-tolerance", type=float, default=0.02)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced rerun that measures peak memory")
+    parser.add_argument("--repeats", type=int, default=5, help="minimum timed runs per seed, the fastest is kept")
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds of timed runs per seed")
+    parser.add_argument("--fitness-cache-size", type=int, default=4096,
+                        help="fitness cache entries, as solve_instance's default (0 benchmarks without the cache)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.zip or DATASETS, args.instances, args.seeds, args.pop_size, args.generations,
+                            not args.no_memory, args.repeats, args.min_time, args.fitness_cache_size)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({key: result['summary'] for key, result in results.items()}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.throughput_tolerance, args.quality_tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against", args.baseline)
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one")
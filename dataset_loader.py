@@ -0,0 +1,42 @@
+import fnmatch
+import posixpath
+import zipfile
+from file_handles import parse_precedence_text, parse_processing_times_text
+from problem_instance import ProblemInstance
+
+INSTANCE_FILES = ('o1.txt', 'o2.txt', 'z1.txt', 'z2.txt')
+
+# Instance folders inside the archive that hold all four files, in sorted order
+def _instance_folders(zip_ref):
+    files = {}
+    for member in zip_ref.namelist():
+        folder, file_name = posixpath.split(member)
+        if file_name in INSTANCE_FILES:
+            files.setdefault(folder, set()).add(file_name)
+    return sorted(folder for folder, names in files.items() if len(names) == len(INSTANCE_FILES))
+
+# Yield parsed instances straight from the ZIP, without extracting; only the members of selected
+# instances are read. names keeps exact instance names, pattern is a glob such as "BART*"
+def iter_zip_instances(zip_path, names=None, pattern=None, number_of_stations=3, robot_density=(0, 1, 1)):
+    names = set(names) if names is not None else None
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for folder in _instance_folders(zip_ref):
+            name = posixpath.basename(folder)
+            if names is not None and name not in names:
+                continue
+            if pattern is not None and not fnmatch.fnmatch(name, pattern):
+                continue
+
+            def read_member(file_name):
+                member = posixpath.join(folder, file_name)
+                return zip_ref.read(member).decode('utf-8'), f"{zip_path}:{member}"
+
+            yield ProblemInstance(
+                name=name,
+                precedence_constraints_line1=parse_precedence_text(*read_member('o1.txt')),
+                precedence_constraints_line2=parse_precedence_text(*read_member('o2.txt')),
+                processing_times_nt1=parse_processing_times_text(*read_member('z1.txt')),
+                processing_times_nt2=parse_processing_times_text(*read_member('z2.txt')),
+                number_of_stations=number_of_stations,
+                robot_density=robot_density
+            )
@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from ga_algo import (robot_factors, fitness_with_robot, cycle_time_lower_bound, priority_seed, seed_priorities,
+                     respects_both_lines)
+
+# Lowest cycle time reachable from the current station loads when the remaining work could be split
+# freely: water-filling raises the least loaded stations (in robot-adjusted time) to a common level
+def balanced_lower_bound(station_loads, remaining_work, factors):
+    adjusted = [load * factor for load, factor in zip(station_loads, factors)]
+    order = sorted(range(len(factors)), key=adjusted.__getitem__)
+    work, speed = remaining_work, 0.0
+    level = max(adjusted)
+    for k, station in enumerate(order):
+        work += station_loads[station]
+        speed += 1.0 / factors[station]
+        level_k = work / speed
+        if k + 1 == len(order) or level_k <= adjusted[order[k + 1]]:
+            return max(level_k, max(adjusted))
+    return level
+
+# Optimality gap of a cycle time against a lower bound, relative to the cycle time
+def optimality_gap(cycle_time, lower_bound):
+    return (cycle_time - lower_bound) / cycle_time if cycle_time else 0.0
+
+# Exact solver for the GA's model: minimize fitness_with_robot over station-label vectors that respect
+# both lines' precedence rule (zoning is a repair heuristic of the GA, not a constraint here).
+#
+# Each line segment is filled right to left, as in arrange_feasible_segment: the first time a label is
+# placed is its last occurrence, so its successors still unplaced can never appear further left. A node
+# is therefore (position, labels placed, labels banned, station loads). Branch-and-bound prunes nodes
+# whose water-filling bound reaches the incumbent. Nodes at one position carry the same total work, so a
+# load vector is only dominated by an equal one: a memo of explored nodes prunes every repeat, and
+# stations that are interchangeable (same robot factor and lines, no precedence role) are tried once per
+# load. Tasks only go to stations that serve their line; with station-dependent times (manual tasks) the
+# work left for the bound counts every task at its cheapest station.
+# max_nodes / time_limit make it a bounded solver: it then returns the incumbent with the best proven
+# lower bound instead of a proof of optimality.
+def branch_and_bound(instance, initial_solution=None, max_nodes=None, time_limit=None):
+    start = time.perf_counter()
+    n_stations = instance.number_of_stations
+    factors = robot_factors(instance.layout).tolist()
+    task_times = np.asarray(instance.task_times, dtype=float)
+    if task_times.ndim == 1:
+        task_times = np.tile(task_times[:, np.newaxis], (1, n_stations))
+    station_mask = instance.station_mask
+    if station_mask is None:
+        station_mask = np.ones((instance.total_tasks, n_stations), dtype=bool)
+    lines = (instance.precedence_index_line1, instance.precedence_index_line2)
+
+    # Incumbent: the given solution (e.g. the GA's best) or the better of the greedy seeds
+    candidates = [priority_seed(instance, seed_priorities(instance, seed)) for seed in ('rpw', 'lpt')]
+    if initial_solution is not None:
+        candidates.append(np.asarray(initial_solution))
+    candidates = [candidate for candidate in candidates
+                  if respects_both_lines(candidate[np.newaxis, :], *lines)[0] and
+                  station_mask[np.arange(instance.total_tasks), candidate].all()]
+    best_solution, best_cycle_time = None, np.inf
+    for candidate in candidates:
+        cycle_time = fitness_with_robot(candidate, instance.task_times, instance.layout)
+        if cycle_time < best_cycle_time:
+            best_solution, best_cycle_time = candidate.copy(), float(cycle_time)
+
+    # Visiting order: each line right to left; successor masks over station labels per line
+    positions, line_of, successor_masks = [], [], []
+    for line, index in enumerate(lines):
+        segment = range(index.tasks_line_end - 1, index.tasks_line_start - 1, -1)
+        positions.extend(segment)
+        line_of.extend([line] * len(segment))
+        successor_map = index.successor_map(range(n_stations))
+        successor_masks.append([sum(1 << successor for successor in successor_map[label]) for label in range(n_stations)])
+    times = task_times[positions].tolist()  # Per depth, the task's time on every station
+    allowed = [np.flatnonzero(station_mask[position]).tolist() for position in positions]
+    constrained = set()
+    for index in lines:
+        for label, successors in index.successor_map(range(n_stations)).items():
+            if successors:
+                constrained |= successors | {label}
+    symmetry_class = [label if label in constrained else ('free', factors[label], tuple(station_mask[:, label]))
+                      for label in range(n_stations)]
+    min_times = task_times[positions].min(axis=1)
+    total_work = float(min_times.sum())
+    remaining_after = np.concatenate((np.cumsum(min_times[::-1])[::-1][1:], [0.0])).tolist()
+    root_bound = cycle_time_lower_bound(instance.task_times, instance.layout)
+
+    explored = set()
+    assignment = [0] * len(positions)
+    stats = {'nodes': 0, 'pruned_bound': 0, 'pruned_dominance': 0}
+    frontier_bound = [np.inf]  # Lowest bound among nodes cut off by the limits
+    limit_hit = [False]
+
+    def search(depth, loads, placed, banned):
+        nonlocal best_solution, best_cycle_time
+        if depth == len(positions):
+            cycle_time = max(load * factor for load, factor in zip(loads, factors))
+            if cycle_time < best_cycle_time - 1e-9:
+                solution = np.empty(instance.total_tasks, dtype=int)
+                solution[positions] = assignment
+                best_solution, best_cycle_time = solution, cycle_time
+            return
+
+        stats['nodes'] += 1
+        if ((max_nodes is not None and stats['nodes'] > max_nodes) or
+                (time_limit is not None and time.perf_counter() - start > time_limit)):
+            limit_hit[0] = True
+            frontier_bound[0] = min(frontier_bound[0], balanced_lower_bound(loads, remaining_after[depth - 1] if depth else
+                                                                            total_work, factors))
+            return
+
+        line = line_of[depth]
+        if depth and line != line_of[depth - 1]:
+            placed, banned = 0, 0  # New line: its precedence state starts empty
+
+        # Dominance: same precedence state, remaining tasks and loads as a node already explored
+        key = (depth, placed, banned, loads)
+        if key in explored:
+            stats['pruned_dominance'] += 1
+            return
+        explored.add(key)
+
+        task_times_here = times[depth]
+        tried = set()
+        for label in sorted(allowed[depth], key=lambda s: (loads[s] + task_times_here[s]) * factors[s]):
+            bit = 1 << label
+            if banned & bit or (symmetry_class[label], loads[label]) in tried:
+                continue
+            tried.add((symmetry_class[label], loads[label]))
+            next_loads = loads[:label] + (loads[label] + task_times_here[label],) + loads[label + 1:]
+            if balanced_lower_bound(next_loads, remaining_after[depth], factors) >= best_cycle_time - 1e-9:
+                stats['pruned_bound'] += 1
+                continue
+            if placed & bit:
+                next_placed, next_banned = placed, banned
+            else:
+                next_placed, next_banned = placed | bit, banned | (successor_masks[line][label] & ~placed)
+            assignment[depth] = label
+            search(depth + 1, next_loads, next_placed, next_banned)
+
+    search(0, (0.0,) * n_stations, 0, 0)
+
+    optimal = not limit_hit[0] and best_solution is not None
+    lower_bound = best_cycle_time if optimal else max(root_bound, min(frontier_bound[0], best_cycle_time))
+    return {
+        'best_solution': best_solution,
+        'cycle_time': best_cycle_time,
+        'lower_bound': lower_bound,
+        'optimal': optimal,
+        'gap': optimality_gap(best_cycle_time, lower_bound) if best_solution is not None else None,
+        'elapsed_time': time.perf_counter() - start,
+        **stats
+    }
@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from dataset_loader import iter_zip_instances
+from instance_cache import iter_cached_instances
+from process_each_folder import solve_instance
+from station_layout import StationLayout
+
+# Parameters that define the station layout of the instance; every other key of a config is passed to solve_instance
+LAYOUT_PARAMETERS = ('number_of_stations', 'robot_density', 'speed_factors')
+RESULT_KEYS = ('cycle_time', 'positive_zoning_percentage', 'negative_zoning_percentage', 'stop_reason',
+               'generations_run', 'elapsed_time', 'lower_bound', 'gap')
+
+# Every combination of the values in the search space (parameter -> list of values)
+def grid_configs(space):
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+# n_samples configs drawn uniformly from the search space, reproducible for a given seed; duplicates are dropped
+def random_configs(space, n_samples, seed=0):
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n_samples):
+        config = {name: rng.choice(list(space[name])) for name in sorted(space)}
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+# Stations and robot layout of a config; robot_density decides the station count when given, otherwise
+# station 0 is worker-only and the rest are mixed, as in the default (0, 1, 1)
+def station_layout(config):
+    robot_density = config.get('robot_density')
+    number_of_stations = config.get('number_of_stations', len(robot_density) if robot_density is not None else 3)
+    if robot_density is None:
+        robot_density = [0] + [1] * (number_of_stations - 1)
+    return number_of_stations, list(robot_density)
+
+# The instance under a config's station layout: per-station speed_factors when given, else station_layout
+def configure_instance(instance, config):
+    if 'speed_factors' in config:
+        return instance.with_layout(StationLayout(config['speed_factors']), instance.robot_eligible)
+    return instance.with_stations(*station_layout(config))
+
+# Stable identifier of one instance x config x seed cell, the resume key in the results file
+def cell_id(dataset, instance_name, config, seed):
+    key = json.dumps([dataset, instance_name, config, seed], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+# Worker: solve one cell quietly and keep the summary figures. A config the GA rejects (ValueError, e.g. tournament_size
+# above pop_size) is recorded as an error; any other exception fails the cell, so it is rerun on resume
+def run_cell(instance, config, seed):
+    solve_options = {name: value for name, value in config.items() if name not in LAYOUT_PARAMETERS}
+    try:
+        result = solve_instance(configure_instance(instance, config), seed=seed, verbose=False, **solve_options)
+    except ValueError as error:
+        return {'error': f"{type(error).__name__}: {error}"}
+    return {key: float(result[key]) if key in ('cycle_time', 'lower_bound', 'gap') else result[key]
+            for key in RESULT_KEYS if key in result}
+
+# Finished cells of a results file; a line cut short by an interruption is ignored (its cell reruns)
+def load_results(results_path):
+    results = []
+    if not os.path.exists(results_path):
+        return results
+    with open(results_path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+# Cut a line left unfinished by an interruption off the end of the results file, so appended records start
+# on a line of their own
+def drop_partial_line(results_path):
+    if not os.path.exists(results_path):
+        return
+    with open(results_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+# Run the instance x config x seed matrix in a process pool. Every finished cell is appended to the JSON-lines
+# results file and synced at once, so an interrupted sweep resumes where it stopped without recomputing cells
+def run_sweep(zip_path, configs, seeds=(0,), results_path='sweeps/results.jsonl', instance_names=None, pattern=None,
+              cache_dir=None, max_workers=None):
+    dataset = os.path.basename(os.path.dirname(os.path.abspath(zip_path)))
+    done = {result['cell'] for result in load_results(results_path)}
+    if cache_dir:
+        instances = list(iter_cached_instances(zip_path, cache_dir, instance_names, pattern))
+    else:
+        instances = list(iter_zip_instances(zip_path, instance_names, pattern))
+
+    pending = []
+    for instance in instances:
+        for config_index, config in enumerate(configs):
+            for seed in seeds:
+                cell = cell_id(dataset, instance.name, config, seed)
+                if cell not in done:
+                    pending.append((cell, instance, config_index, config, seed))
+    print(f"Sweep: {len(instances)} instances x {len(configs)} configs x {len(seeds)} seeds, "
+          f"{len(done)} cells done, {len(pending)} to run")
+
+    os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+    drop_partial_line(results_path)
+    with open(results_path, 'a') as results_file, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_cell, instance, config, seed): (cell, instance.name, config_index, config, seed)
+                   for cell, instance, config_index, config, seed in pending}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            cell, instance_name, config_index, config, seed = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as error:  # Not recorded, so the cell runs again on resume
+                print(f"[{finished}/{len(pending)}] {instance_name} config {config_index} seed {seed} failed: "
+                      f"{type(error).__name__}: {error}")
+                continue
+            record = {'cell': cell, 'dataset': dataset, 'instance': instance_name, 'config_index': config_index,
+                      'config': config, 'seed': seed, **outcome}
+            results_file.write(json.dumps(record) + '\n')
+            results_file.flush()
+            os.fsync(results_file.fileno())
+            print(f"[{finished}/{len(pending)}] {instance_name} config {config_index} seed {seed}: "
+                  f"{record.get('cycle_time', record.get('error'))}")
+    return load_results(results_path)
+
+# Mean and best cycle time per instance and config, best configs first
+def summarize_sweep(results):
+    rows = [dict(instance=result['instance'], config=json.dumps(result['config'], sort_keys=True),
+                 cycle_time=result['cycle_time']) for result in results if 'cycle_time' in result]
+    if not rows:
+        return pd.DataFrame(columns=['instance', 'config', 'mean_cycle_time', 'best_cycle_time', 'runs'])
+    df = pd.DataFrame(rows)
+    summary = df.groupby(['instance', 'config'])['cycle_time'].agg(mean_cycle_time='mean', best_cycle_time='min',
+                                                                   runs='count').reset_index()
+    return summary.sort_values(['instance', 'mean_cycle_time'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable parameter sweep over instances x configs x seeds")
+    parser.add_argument("space", help="JSON file mapping parameters to lists of values, e.g. "
+                                      '{"pop_size": [10, 20], "mutation_rate": [0.1, 0.2], "robot_density": [[0, 1, 1]]}')
+    parser.add_argument("--zip", default="./PALBP_DATASET/PALBP_DATASET/small/PALBP-data-sets.zip")
+    parser.add_argument("--instances", nargs="+", default=None)
+    parser.add_argument("--pattern", default=None)
+    parser.add_argument("--search", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=20, help="configs drawn by the random search")
+    parser.add_argument("--search-seed", type=int, default=0)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--results", default="sweeps/results.jsonl", help="JSON-lines results file, appended and resumed")
+    parser.add_argument("--cache-dir", default=".instance_cache")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.space) as f:
+        space = json.load(f)
+    if args.search == "grid":
+        configs = grid_configs(space)
+    else:
+        configs = random_configs(space, args.samples, args.search_seed)
+    results = run_sweep(args.zip, configs, args.seeds, args.results, args.instances, args.pattern,
+                        None if args.no_cache else args.cache_dir, args.workers)
+    print(summarize_sweep(results).to_string(index=False))
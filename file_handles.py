@@ -1,6 +1,5 @@
 import zipfile
 import numpy as np
-import main
 
 # Extract the ZIP file
 def extract_zip(zip_path, extract_to):
@@ -8,43 +7,72 @@ def extract_zip(zip_path, extract_to):
         zip_ref.extractall(extract_to)
 
 def read_precedence(file_path):
-    precedence_constraints = []
     with open(file_path, 'r') as f:
-        for line in f:
-            # Strip whitespace and split the line
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-            parts = line.split()
-            if len(parts) != 2:
-                print(f"Skipping invalid line in {file_path}: {line}")
-                continue
-            try:
-                task_a = int(parts[0].strip('"').strip("'"))
-                task_b = int(parts[1].strip('"').strip("'"))
-                precedence_constraints.append((task_a, task_b))
-            except ValueError as e:
-                print(f"Error parsing line in {file_path}: {line} - {e}")
+        return parse_precedence_lines(f, file_path)
+
+# Parse precedence pairs line by line, reporting malformed lines
+def parse_precedence_lines(lines, source):
+    precedence_constraints = []
+    for line in lines:
+        # Strip whitespace and split the line
+        line = line.strip()
+        if not line:  # Skip empty lines
+            continue
+        parts = line.split()
+        if len(parts) != 2:
+            print(f"Skipping invalid line in {source}: {line}")
+            continue
+        try:
+            task_a = int(parts[0].strip('"').strip("'"))
+            task_b = int(parts[1].strip('"').strip("'"))
+            precedence_constraints.append((task_a, task_b))
+        except ValueError as e:
+            print(f"Error parsing line in {source}: {line} - {e}")
     return precedence_constraints
 
 def read_processing_times(file_path):
     with open(file_path, 'r') as f:
-        processing_times = []
-        for line in f:
-            # Strip unwanted characters like quotes, whitespace, or newline
-            clean_line = line.strip().strip('"').strip("'")
-            try:
-                processing_times.append(int(clean_line))
-            except ValueError as e:
-                print(f"Error parsing line in {file_path}: {line} - {e}")
-        return processing_times
+        return parse_processing_times_lines(f, file_path)
+
+# Parse one processing time per line, reporting malformed lines
+def parse_processing_times_lines(lines, source):
+    processing_times = []
+    for line in lines:
+        # Strip unwanted characters like quotes, whitespace, or newline
+        clean_line = line.strip().strip('"').strip("'")
+        try:
+            processing_times.append(int(clean_line))
+        except ValueError as e:
+            print(f"Error parsing line in {source}: {line} - {e}")
+    return processing_times
+
+# Bulk parse of a whole precedence file with NumPy; falls back to the line parser on malformed input
+def parse_precedence_text(text, source):
+    rows = [line.split() for line in text.splitlines() if line.strip()]
+    if all(len(parts) == 2 for parts in rows):
+        try:
+            tokens = [part.strip('"').strip("'") for parts in rows for part in parts]
+            return [tuple(pair) for pair in np.array(tokens, dtype=np.int64).reshape(-1, 2).tolist()]
+        except ValueError:
+            pass
+    return parse_precedence_lines(text.splitlines(), source)
+
+# Bulk parse of a whole processing-time file with NumPy; falls back to the line parser on malformed input
+def parse_processing_times_text(text, source):
+    lines = text.splitlines()
+    if all(len(line.split()) == 1 for line in lines):
+        try:
+            return np.array([line.strip().strip('"').strip("'") for line in lines], dtype=np.int64)
+        except ValueError:
+            pass
+    return np.array(parse_processing_times_lines(lines, source), dtype=np.int64)
 
 # Assign tasks to stations based on precedence-matching rule
-def assign_tasks_by_precedence():
-    assignment = np.zeros(main.total_tasks, dtype=int)
-    for precedence_value in main.precedence_order:
-        task_idx = main.precedence_mapping[precedence_value]
-        station = main.station_assignments[precedence_value]
+def assign_tasks_by_precedence(instance):
+    assignment = np.zeros(instance.total_tasks, dtype=int)
+    for precedence_value in instance.precedence_order:
+        task_idx = instance.precedence_mapping[precedence_value]
+        station = instance.station_assignments[precedence_value]
         assignment[task_idx] = station  # Assign task to the station
     return assignment
 
@@ -61,4 +89,200 @@ def respects_precedence(solution, precedence_constraints, tasks_line_start, task
             # Ensure task_a appears before task_b
             if task_positions[task_a] > task_positions[task_b]:
                 return False  # Precedence violated
-    return True
\ No newline at end of file
+    return True
+
+# Arrays memory-mapped whole from a .npy file (e.g. by the instance cache) travel to worker processes as their
+# file name and are mapped again there, so all workers share the same pages; other arrays pickle as usual
+def pickle_memmaps(state, names):
+    state = state.copy()
+    for name in names:
+        array = state[name]
+        # A slice of a mapped file has the mapped array as base, the whole file the mmap itself
+        if isinstance(array, np.memmap) and array.filename and not isinstance(array.base, np.ndarray):
+            state[name] = ('memmap', array.filename)
+    return state
+
+def unpickle_memmaps(state, names):
+    for name in names:
+        if isinstance(state[name], tuple):
+            state[name] = np.load(state[name][1], mmap_mode='r')
+    return state
+
+# Precedence constraints of one line compiled once per instance into edge index arrays. An (n, 2) int64
+# edge array, e.g. memory-mapped from the instance cache, is used as is
+class PrecedenceIndex:
+    def __init__(self, precedence_constraints, tasks_line_start, tasks_line_end):
+        self.edges = np.asanyarray(precedence_constraints, dtype=np.int64)
+        if self.edges.ndim != 2:
+            self.edges = self.edges.reshape(-1, 2)
+        self.tasks_line_start = tasks_line_start
+        self.tasks_line_end = tasks_line_end
+        self.size = int(self.edges.max()) + 1 if len(self.edges) else 0
+
+    @property
+    def predecessors(self):
+        return self.edges[:, 0]
+
+    @property
+    def successors(self):
+        return self.edges[:, 1]
+
+    # The constraints as (task_a, task_b) pairs
+    def constraints(self):
+        return [tuple(pair) for pair in self.edges.tolist()]
+
+    def __getstate__(self):
+        return pickle_memmaps(self.__dict__, ('edges',))
+
+    def __setstate__(self, state):
+        self.__dict__.update(unpickle_memmaps(state, ('edges',)))
+
+    # Same rule as respects_precedence for a single solution
+    def respects(self, solution):
+        return bool(self.respects_population(np.asarray(solution)[np.newaxis, :])[0])
+
+    # Successors of every value, restricted to the given values
+    def successor_map(self, values):
+        successor_map = {value: set() for value in values}
+        for task_a, task_b in zip(self.predecessors.tolist(), self.successors.tolist()):
+            if task_a in successor_map and task_b in successor_map:
+                successor_map[task_a].add(task_b)
+        return successor_map
+
+    # Validate a whole population (one row per individual) at once
+    def respects_population(self, population):
+        population = np.asarray(population)
+        segment = population[:, self.tasks_line_start:self.tasks_line_end]
+        pop_size, segment_length = segment.shape
+        if len(self.predecessors) == 0 or segment_length == 0:
+            return np.ones(pop_size, dtype=bool)
+
+        # Last position of every task value in each row, -1 when the value is absent
+        size = max(self.size, int(segment.max()) + 1)
+        task_positions = np.full(pop_size * size, -1, dtype=np.int64)
+        flat_values = (segment + size * np.arange(pop_size)[:, np.newaxis]).ravel()
+        np.maximum.at(task_positions, flat_values, np.tile(np.arange(segment_length), pop_size))
+        task_positions = task_positions.reshape(pop_size, size)
+
+        positions_a = task_positions[:, self.predecessors]
+        positions_b = task_positions[:, self.successors]
+        violated = (positions_a >= 0) & (positions_b >= 0) & (positions_a > positions_b)
+        return ~violated.any(axis=1)
+
+# Feasible station reassignments, compiled once per instance: the precedence edges between station
+# labels of each line. A move changes the last occurrence of at most two labels, so it is checked in
+# O(edges) against the current last/previous occurrence of every label instead of a full re-check
+class MoveIndex:
+    def __init__(self, precedence_index_line1, precedence_index_line2, number_of_stations):
+        self.number_of_stations = number_of_stations
+        self.lines = []
+        for index in (precedence_index_line1, precedence_index_line2):
+            relevant = (index.predecessors < number_of_stations) & (index.successors < number_of_stations)
+            self.lines.append((index.tasks_line_start, index.tasks_line_end,
+                               index.predecessors[relevant], index.successors[relevant]))
+
+    # Mask (len(tasks), number_of_stations) of the stations every given task may move to
+    def feasible_moves(self, individual, tasks):
+        individual = np.asarray(individual)
+        tasks = np.asarray(tasks)
+        n_stations = self.number_of_stations
+        feasible = np.zeros((len(tasks), n_stations), dtype=bool)
+
+        # Last and previous occurrence of every station label per line, -1 when absent
+        occurrences = []
+        for start, end, predecessors, successors in self.lines:
+            segment = individual[start:end]
+            last = np.full(n_stations, -1)
+            previous = np.full(n_stations, -1)
+            for label in range(n_stations):
+                positions = np.flatnonzero(segment == label)
+                if len(positions):
+                    last[label] = positions[-1]
+                if len(positions) > 1:
+                    previous[label] = positions[-2]
+            line_ok = not ((last[predecessors] >= 0) & (last[successors] >= 0) & (last[predecessors] > last[successors])).any()
+            occurrences.append((last, previous, line_ok))
+
+        for line, (start, end, predecessors, successors) in enumerate(self.lines):
+            in_line = (tasks >= start) & (tasks < end)
+            other_lines_ok = all(line_ok for other, (_, _, line_ok) in enumerate(occurrences) if other != line)
+            if not in_line.any() or not other_lines_ok:
+                continue
+            last, previous, _ = occurrences[line]
+            segment = individual[start:end]
+            positions = tasks[in_line] - start
+            moves = len(positions)
+
+            # Last occurrences after each move (task, target): the source label falls back to its
+            # previous occurrence when the task held its last one, the target label may move right
+            sources = segment[positions]
+            moved_last = np.tile(last, (moves, n_stations, 1))
+            rows = np.arange(moves)
+            source_last = np.where(last[sources] == positions, previous[sources], last[sources])
+            moved_last[rows, :, sources] = source_last[:, np.newaxis]
+            targets = np.arange(n_stations)
+            moved_last[:, targets, targets] = np.maximum(last[targets], positions[:, np.newaxis])
+
+            last_a = moved_last[:, :, predecessors]
+            last_b = moved_last[:, :, successors]
+            valid = ~((last_a >= 0) & (last_b >= 0) & (last_a > last_b)).any(axis=-1)
+            valid[rows, sources] = False  # Staying put is not a move
+            feasible[in_line] = valid
+        return feasible
+
+# Zoning relationships of both lines as boolean adjacency matrices over values below size (task ids and
+# station labels). Built once and read-only afterwards, so instances and concurrent solves can share one
+class ZoningIndex:
+    def __init__(self, precedence_constraints_line1, precedence_constraints_line2, tasks_nt1, size=0):
+        edges = np.array(list(precedence_constraints_line1) + list(precedence_constraints_line2), dtype=np.int64).reshape(-1, 2)
+        self.edges = edges
+        self.tasks_nt1 = tasks_nt1
+        self._build(max(size, int(edges.max()) + 1 if len(edges) else 0))
+
+    # Rebuild from matrices computed earlier, e.g. memory-mapped from the instance cache
+    @classmethod
+    def from_matrices(cls, edges, tasks_nt1, zoned, swap):
+        index = cls.__new__(cls)
+        index.edges = np.asarray(edges).reshape(-1, 2)
+        index.tasks_nt1 = tasks_nt1
+        index.zoned = zoned
+        index.swap = swap
+        return index
+
+    def __getstate__(self):
+        return pickle_memmaps(self.__dict__, ('zoned', 'swap'))
+
+    def __setstate__(self, state):
+        self.__dict__.update(unpickle_memmaps(state, ('zoned', 'swap')))
+
+    @property
+    def size(self):
+        return len(self.zoned)
+
+    # This index when every value below size can be looked up, otherwise a larger copy; never grows in place
+    def with_size(self, size):
+        if size <= self.size:
+            return self
+        index = ZoningIndex.__new__(ZoningIndex)
+        index.edges = self.edges
+        index.tasks_nt1 = self.tasks_nt1
+        index._build(size)
+        return index
+
+    def _build(self, size):
+        zoned = np.zeros((size, size), dtype=bool)
+        zoned[self.edges[:, 0], self.edges[:, 1]] = True  # Positive zoning
+        zoned[self.edges[:, 1], self.edges[:, 0]] = True
+        values = np.arange(size)
+        same_line = (values[:, np.newaxis] // self.tasks_nt1) == (values[np.newaxis, :] // self.tasks_nt1)
+        self.zoned = zoned
+        self.swap = same_line & ~zoned  # Pairs the repair pass swaps
+
+    # Number of positions i < j whose values are (positively) zoned
+    def count_zoned_pairs(self, solution):
+        solution = np.asarray(solution)
+        if len(solution) == 0:
+            return 0
+        counts = np.bincount(solution, minlength=self.size)
+        pairs = np.outer(counts, counts) - np.diag(counts)  # Ordered pairs of distinct positions
+        return int((pairs * self.zoned).sum()) // 2
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+import numpy as np
+
+# Bounded LRU cache of fitness scores keyed by the bytes of the station-assignment vector
+class FitnessCache:
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.context = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # Drop every entry when the processing times or robot layout differ from the cached ones
+    def validate(self, processing_times, robot_density):
+        context = (np.asarray(processing_times).tobytes(), tuple(robot_density))
+        if context != self.context:
+            if self.context is not None:
+                self.invalidations += 1
+            self.entries.clear()
+            self.context = context
+
+    # Cached scores of a population, NaN where missing, plus the row indices of the misses
+    def lookup(self, population):
+        scores = np.full(len(population), np.nan)
+        missing = []
+        for row, individual in enumerate(population):
+            key = individual.tobytes()
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                scores[row] = self.entries[key]
+            else:
+                missing.append(row)
+        self.hits += len(population) - len(missing)
+        self.misses += len(missing)
+        return scores, np.array(missing, dtype=int)
+
+    def store(self, population, scores):
+        for individual, score in zip(population, scores):
+            key = individual.tobytes()
+            self.entries[key] = score
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)  # Least recently used
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.entries),
+            'invalidations': self.invalidations
+        }
@@ -1,77 +1,286 @@
 import numpy as np
 import random
-from file_handles import read_precedence, read_processing_times, assign_tasks_by_precedence, respects_precedence
-import main
+from file_handles import read_precedence, read_processing_times, assign_tasks_by_precedence
+from profiling import stage
+from station_layout import StationLayout, ROBOT_SPEED_FACTOR
 
 # Fitness function: calculate cycle time considering worker and robot constraints
 def fitness_with_robot(individual, processing_times, robot_density):
-    station_loads = np.zeros(main.number_of_stations)
-
-    for task in range(len(individual)):
-        station = individual[task]
-        station_loads[station] += processing_times[task]
-
-    # Apply the cycle time rules based on station type
-    adjusted_station_loads = np.zeros_like(station_loads)
-    for i, load in enumerate(station_loads):
-        if robot_density[i] == 0:  # Worker-only
-            adjusted_station_loads[i] = load
-        else:  # Mixed (Worker and Robot)
-            adjusted_station_loads[i] = 0.7 * load
-
-    return max(adjusted_station_loads)  # Minimize the maximum cycle time
-
-# Ensure initial population respects precedence
-def initialize_population_with_precedence(pop_size, initial_assignment, precedence_constraints_line1, precedence_constraints_line2):
-    population = []
-    for _ in range(pop_size):
-        while True:
-            individual = initial_assignment.copy()
-            np.random.shuffle(individual[:main.tasks_nt1])  # Shuffle Line 1
-            np.random.shuffle(individual[main.tasks_nt1:])  # Shuffle Line 2
-            if (respects_precedence(individual, precedence_constraints_line1, 0, main.tasks_nt1) and
-                    respects_precedence(individual, precedence_constraints_line2, main.tasks_nt1, main.total_tasks)):
-                population.append(individual)
-                break
+    return fitness_population(np.asarray(individual)[np.newaxis, :], processing_times, robot_density)[0]
+
+# Robot speed-up factor per station: those of a StationLayout, or from a robot_density list 1 for
+# worker-only and ROBOT_SPEED_FACTOR for mixed (worker and robot)
+def robot_factors(robot_density):
+    if isinstance(robot_density, StationLayout):
+        return robot_density.speed_factors
+    return np.where(np.asarray(robot_density) == 0, 1.0, ROBOT_SPEED_FACTOR)
+
+# Time of tasks on stations (arrays of the same shape). processing_times holds one time per task, or a
+# (tasks, stations) matrix when times depend on the station (ProblemInstance.task_times)
+def task_station_times(processing_times, tasks, stations):
+    processing_times = np.asarray(processing_times, dtype=float)
+    if processing_times.ndim == 1:
+        return np.broadcast_to(processing_times[tasks], np.broadcast(tasks, stations).shape)
+    return processing_times[tasks, stations]
+
+# Station loads of every individual as a (pop_size, n_stations) matrix
+def station_loads_population(population, processing_times, n_stations):
+    population = np.asarray(population)
+    pop_size, n_tasks = population.shape
+
+    # Offset each row's stations so a single bincount yields the whole load matrix
+    flat_stations = (population + n_stations * np.arange(pop_size)[:, np.newaxis]).ravel()
+    if np.ndim(processing_times) == 1:
+        weights = np.tile(np.asarray(processing_times[:n_tasks], dtype=float), pop_size)
+    else:
+        weights = task_station_times(processing_times, np.arange(n_tasks)[np.newaxis, :], population).ravel()
+    station_loads = np.bincount(flat_stations, weights=weights, minlength=pop_size * n_stations)
+    return station_loads.reshape(pop_size, n_stations)
+
+# Robot-adjusted cycle time from station loads (last axis)
+def cycle_times_from_loads(station_loads, robot_density):
+    adjusted_station_loads = station_loads * robot_factors(robot_density)
+    return adjusted_station_loads.max(axis=-1)  # Minimize the maximum cycle time
+
+# Batched fitness: cycle time of every individual of the population in one call
+def fitness_population(population, processing_times, robot_density):
+    return cycle_times_from_loads(station_loads_population(population, processing_times, len(robot_density)), robot_density)
+
+# Lower bound on the cycle time of any assignment: the total work spread so every station finishes
+# at the same robot-adjusted time, and never below the longest task on its fastest station. With
+# station-dependent times every task counts with its cheapest one
+def cycle_time_lower_bound(processing_times, robot_density):
+    factors = robot_factors(robot_density)
+    times = np.asarray(processing_times, dtype=float)
+    if times.ndim == 1:
+        times = np.tile(times[:, np.newaxis], (1, len(factors)))
+    balanced = times.min(axis=1).sum() / (1.0 / factors).sum()
+    longest = (times * factors).min(axis=1).max(initial=0.0)
+    return float(max(balanced, longest))
+
+# Incremental evaluation: station loads after swapping the stations of tasks idx1 and idx2, for arrays
+# of candidate swaps. Only the two affected stations change, so a move costs O(stations), not O(tasks)
+def swap_move_loads(individual, station_loads, idx1, idx2, processing_times):
+    idx1, idx2 = np.atleast_1d(idx1), np.atleast_1d(idx2)
+    stations1, stations2 = individual[idx1], individual[idx2]
+    moved_loads = np.tile(station_loads, (len(idx1), 1))
+    rows = np.arange(len(idx1))
+    moved_loads[rows, stations1] += (task_station_times(processing_times, idx2, stations1) -
+                                     task_station_times(processing_times, idx1, stations1))
+    moved_loads[rows, stations2] += (task_station_times(processing_times, idx1, stations2) -
+                                     task_station_times(processing_times, idx2, stations2))
+    return moved_loads
+
+# Station loads of the child parent_head[:point] + parent_tail[point:], updated from whichever
+# parent shares the longer side of the cut
+def crossover_child_loads(parent_head, parent_tail, head_loads, tail_loads, point, processing_times):
+    n_stations = len(head_loads)
+    if point >= len(parent_head) - point:
+        cut = slice(point, None)
+        base_loads, removed, added = head_loads, parent_head[cut], parent_tail[cut]
+    else:
+        cut = slice(None, point)
+        base_loads, removed, added = tail_loads, parent_tail[cut], parent_head[cut]
+    tasks = np.arange(len(parent_head))[cut]
+    return (base_loads
+            - np.bincount(removed, weights=task_station_times(processing_times, tasks, removed), minlength=n_stations)
+            + np.bincount(added, weights=task_station_times(processing_times, tasks, added), minlength=n_stations))
+
+# Batched fitness through an optional FitnessCache; only the misses are scored
+def cached_fitness_population(population, processing_times, robot_density, fitness_cache=None):
+    if fitness_cache is None:
+        return fitness_population(population, processing_times, robot_density)
+    fitness_cache.validate(processing_times, robot_density)
+    fitness_scores, missing = fitness_cache.lookup(population)
+    if len(missing):
+        fitness_scores[missing] = fitness_population(population[missing], processing_times, robot_density)
+        fitness_cache.store(population[missing], fitness_scores[missing])
+    return fitness_scores
+
+# Feasibility mask of a population against both lines
+def respects_both_lines(population, precedence_index_line1, precedence_index_line2):
+    return (precedence_index_line1.respects_population(population) &
+            precedence_index_line2.respects_population(population))
+
+# Kahn's algorithm; ties are broken at random, or by the highest priority when given
+def topological_order(successor_map, priority=None, rng=None):
+    rng = random if rng is None else rng
+    in_degree = {value: 0 for value in successor_map}
+    for successors in successor_map.values():
+        for successor in successors:
+            in_degree[successor] += 1
+    ready = [value for value, degree in in_degree.items() if degree == 0]
+    order = []
+    while ready:
+        if priority is None:
+            pick = rng.randrange(len(ready))
+        else:
+            pick = max(range(len(ready)), key=lambda k: priority[ready[k]])
+        value = ready.pop(pick)
+        order.append(value)
+        for successor in successor_map[value]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                ready.append(successor)
+    if len(order) != len(successor_map):
+        raise ValueError("Precedence constraints contain a cycle")
+    return order
+
+# Ranked positional weight: own time plus the times of all transitive successors
+def positional_weights(precedence_index, processing_times_line):
+    tasks = range(1, len(processing_times_line) + 1)
+    successor_map = precedence_index.successor_map(tasks)
+    reachable = {}
+    for task in reversed(topological_order(successor_map, priority={task: -task for task in tasks})):
+        reachable[task] = set(successor_map[task])
+        for successor in successor_map[task]:
+            reachable[task] |= reachable[successor]
+    return {task: processing_times_line[task - 1] + sum(processing_times_line[s - 1] for s in reachable[task])
+            for task in tasks}
+
+# Feasible arrangement of a line segment's values, filled right to left: a value may take its
+# last occurrence only once all of its successors already sit to its right. Values are drawn at
+# random, or kept in place where possible when keep_order is set
+def arrange_feasible_segment(segment, successor_map, keep_order=False, rng=None):
+    rng = random if rng is None else rng
+    values, counts = np.unique(segment, return_counts=True)
+    remaining = dict(zip(values.tolist(), counts.tolist()))
+    placed = set()
+    arranged = np.empty_like(segment)
+    for position in range(len(segment) - 1, -1, -1):
+        eligible = [value for value, count in remaining.items()
+                    if count and (value in placed or successor_map[value] <= placed)]
+        if not eligible:
+            raise ValueError("Precedence constraints contain a cycle")
+        if not keep_order:
+            value = rng.choices(eligible, weights=[remaining[value] for value in eligible])[0]
+        elif segment[position] in eligible:
+            value = segment[position]
+        else:
+            value = max(eligible, key=remaining.get)
+        remaining[value] -= 1
+        placed.add(value)
+        arranged[position] = value
+    return arranged
+
+# Greedy seed: tasks in priority order go to the allowed station with the lowest robot-adjusted load
+def priority_seed(instance, priorities):
+    factors = robot_factors(instance.layout)
+    station_loads = np.zeros(instance.number_of_stations)
+    individual = np.zeros(instance.total_tasks, dtype=int)
+    stations = np.arange(instance.number_of_stations)
+    for task in sorted(range(instance.total_tasks), key=lambda task: -priorities[task]):
+        task_times = task_station_times(instance.task_times, task, stations)
+        adjusted = (station_loads + task_times) * factors
+        if instance.station_mask is not None:
+            adjusted = np.where(instance.station_mask[task], adjusted, np.inf)
+        station = np.argmin(adjusted)
+        station_loads[station] += task_times[station]
+        individual[task] = station
+
+    for index in (instance.precedence_index_line1, instance.precedence_index_line2):
+        segment = individual[index.tasks_line_start:index.tasks_line_end]
+        individual[index.tasks_line_start:index.tasks_line_end] = arrange_feasible_segment(
+            segment, index.successor_map(set(segment.tolist())), keep_order=True)
+    return individual
+
+# Priorities per task for the heuristic seeds
+def seed_priorities(instance, seed):
+    if seed == 'lpt':  # Longest processing time
+        return list(instance.processing_times)
+    if seed == 'rpw':  # Ranked positional weight, computed per line on the o1/o2 DAGs
+        priorities = []
+        for index in (instance.precedence_index_line1, instance.precedence_index_line2):
+            times = instance.processing_times[index.tasks_line_start:index.tasks_line_end]
+            weights = positional_weights(index, times)
+            priorities.extend(weights[task] for task in range(1, len(times) + 1))
+        return priorities
+    raise ValueError(f"Unknown seed heuristic: {seed}")
+
+# Constructive initializer: heuristic seeds first, then random arrangements that are feasible by construction
+def initialize_population_topological(instance, pop_size, initial_assignment, seeds=('rpw', 'lpt'), rng=None):
+    population = [priority_seed(instance, seed_priorities(instance, seed)) for seed in seeds[:pop_size]]
+
+    indices = (instance.precedence_index_line1, instance.precedence_index_line2)
+    successor_maps = [index.successor_map(set(initial_assignment[index.tasks_line_start:index.tasks_line_end].tolist()))
+                      for index in indices]
+    while len(population) < pop_size:
+        individual = initial_assignment.copy()
+        for index, successor_map in zip(indices, successor_maps):
+            individual[index.tasks_line_start:index.tasks_line_end] = arrange_feasible_segment(
+                initial_assignment[index.tasks_line_start:index.tasks_line_end], successor_map, rng=rng)
+        population.append(individual)
     return np.array(population)
 
 # Tournament selection
-def tournament_selection(population, fitness_scores, tournament_size=3):
-    selected = []
-    for _ in range(len(population)):
-        competitors = random.sample(list(enumerate(fitness_scores)), tournament_size)
-        winner = min(competitors, key=lambda x: x[1])[0]
-        selected.append(population[winner])
-    return np.array(selected)
-
-# Crossover function
-def single_point_crossover_with_precedence(parent1, parent2, precedence_constraints_line1, precedence_constraints_line2):
-    point = random.randint(1, len(parent1) - 1)
+def tournament_selection(population, fitness_scores, tournament_size=3, rng=None):
+    return population[tournament_selection_indices(fitness_scores, tournament_size, rng)]
+
+# Indices of the tournament winners, one per population slot
+def tournament_selection_indices(fitness_scores, tournament_size=3, rng=None):
+    rng = random if rng is None else rng
+    winners = []
+    for _ in range(len(fitness_scores)):
+        competitors = rng.sample(list(enumerate(fitness_scores)), tournament_size)
+        winners.append(min(competitors, key=lambda x: x[1])[0])
+    return np.array(winners, dtype=int)
+
+# Crossover function; with parent_loads the offspring loads are returned too
+def single_point_crossover_with_precedence(parent1, parent2, precedence_index_line1, precedence_index_line2,
+                                           parent_loads=None, processing_times=None, timer=None, rng=None):
+    rng = random if rng is None else rng
+    point = rng.randint(1, len(parent1) - 1)
     offspring1 = np.concatenate((parent1[:point], parent2[point:]))
     offspring2 = np.concatenate((parent2[:point], parent1[point:]))
 
-    if (not respects_precedence(offspring1, precedence_constraints_line1, 0, main.tasks_nt1) or
-            not respects_precedence(offspring1, precedence_constraints_line2, main.tasks_nt1, main.total_tasks)):
+    valid1, valid2 = respects_both_lines(np.stack((offspring1, offspring2)), precedence_index_line1, precedence_index_line2)
+    if not valid1:
         offspring1 = parent1.copy()
-    if (not respects_precedence(offspring2, precedence_constraints_line1, 0, main.tasks_nt1) or
-            not respects_precedence(offspring2, precedence_constraints_line2, main.tasks_nt1, main.total_tasks)):
+    if not valid2:
         offspring2 = parent2.copy()
+    if timer is not None:
+        timer.count('crossover_offspring', 2)
+        timer.count('crossover_rejected', int(not valid1) + int(not valid2))
+
+    if parent_loads is None:
+        return offspring1, offspring2
+    loads1, loads2 = parent_loads
+    offspring_loads1 = crossover_child_loads(parent1, parent2, loads1, loads2, point, processing_times) if valid1 else loads1.copy()
+    offspring_loads2 = crossover_child_loads(parent2, parent1, loads2, loads1, point, processing_times) if valid2 else loads2.copy()
+    return offspring1, offspring2, offspring_loads1, offspring_loads2
+
+# Mutation function; with station_loads the mutated individual's loads are returned too. With a station_mask
+# (tasks, stations) a swap must leave both tasks on stations they are allowed on
+def swap_mutation_with_precedence(individual, precedence_index_line1, precedence_index_line2, attempts=10,
+                                  station_loads=None, processing_times=None, timer=None, rng=None, station_mask=None):
+    rng = random if rng is None else rng
+    # Try multiple swaps to find a valid one, all candidates checked in one batch
+    candidates = np.tile(individual, (attempts, 1))
+    rows = np.arange(attempts)
+    swaps = np.array([rng.sample(range(len(individual)), 2) for _ in range(attempts)])
+    candidates[rows, swaps[:, 0]] = individual[swaps[:, 1]]
+    candidates[rows, swaps[:, 1]] = individual[swaps[:, 0]]
 
-    return offspring1, offspring2
+    valid = respects_both_lines(candidates, precedence_index_line1, precedence_index_line2)
+    if station_mask is not None:
+        valid &= (station_mask[swaps[:, 0], individual[swaps[:, 1]]] & station_mask[swaps[:, 1], individual[swaps[:, 0]]])
+    valid = np.flatnonzero(valid)
+    if timer is not None:
+        timer.count('mutations')
+        timer.count('mutation_swaps_rejected', int(valid[0]) if len(valid) else attempts)
+        timer.count('mutations_failed', int(not len(valid)))
+    if station_loads is None:
+        if len(valid):
+            return candidates[valid[0]]
+        return individual  # Return original if no valid mutation found
 
-# Mutation function
-def swap_mutation_with_precedence(individual, precedence_constraints_line1, precedence_constraints_line2):
-    for _ in range(10):  # Try multiple swaps to find a valid one
-        mutated = individual.copy()
-        idx1, idx2 = random.sample(range(len(mutated)), 2)
-        mutated[idx1], mutated[idx2] = mutated[idx2], mutated[idx1]
-        if (respects_precedence(mutated, precedence_constraints_line1, 0, main.tasks_nt1) and
-                respects_precedence(mutated, precedence_constraints_line2, main.tasks_nt1, main.total_tasks)):
-            return mutated
-    return individual  # Return original if no valid mutation found
+    if len(valid):
+        idx1, idx2 = swaps[valid[0]]
+        return candidates[valid[0]], swap_move_loads(individual, station_loads, idx1, idx2, processing_times)[0]
+    return individual, station_loads
 
 # Apply zoning constraints after crossover and mutation
-def apply_zoning_constraints(population, precedence_constraints_line1, precedence_constraints_line2):
+def apply_zoning_constraints(population, precedence_constraints_line1, precedence_constraints_line2, tasks_nt1):
     def zoning_check(task_a, task_b):
         # Check precedence to determine positive or negative zoning
         for constraint in precedence_constraints_line1 + precedence_constraints_line2:
@@ -82,55 +291,218 @@ def apply_zoning_constraints(population, precedence_constraints_line1, precedenc
     for individual in population:
         for i in range(len(individual) - 1):
             for j in range(i + 1, len(individual)):
-                if individual[i] // main.tasks_nt1 == individual[j] // main.tasks_nt1:  # Same line check
+                if individual[i] // tasks_nt1 == individual[j] // tasks_nt1:  # Same line check
                     if not zoning_check(individual[i], individual[j]):
                         # Repair the solution by swapping
                         individual[i], individual[j] = individual[j], individual[i]
     return population
 
+# Zoning repair with the same result as apply_zoning_constraints. Pair (i, j) only depends on
+# pairs with a smaller i + j, so each anti-diagonal i + j = t is swapped at once across the
+# whole population: O(n) vectorized steps with O(1) zoning lookups instead of O(n^2 * m) per individual.
+# With a station_mask (tasks, stations) a pair is only swapped when both values stay on allowed stations
+def repair_zoning_population(population, zoning_index, station_mask=None):
+    population = np.asarray(population)
+    n_tasks = population.shape[1]
+    if population.size == 0:
+        return population
+    if population.max() >= zoning_index.size:
+        raise ValueError(f"Value {population.max()} is outside the zoning index (size {zoning_index.size})")
+    for t in range(1, 2 * n_tasks - 2):
+        i = np.arange(max(0, t - n_tasks + 1), (t - 1) // 2 + 1)
+        j = t - i
+        values_i = population[:, i]
+        values_j = population[:, j]
+        swap = zoning_index.swap[values_i, values_j]
+        if station_mask is not None:
+            swap &= station_mask[i, values_j] & station_mask[j, values_i]
+        population[:, i] = np.where(swap, values_j, values_i)
+        population[:, j] = np.where(swap, values_i, values_j)
+    return population
+
 # Elitism selection: Survivors
 def elitism_selection(population, fitness_scores, elite_size=2):
-    elites = np.argsort(fitness_scores)[:elite_size]
-    return population[elites]
+    return population[elite_indices(fitness_scores, elite_size)]
 
-# Genetic Algorithm
-def genetic_algorithm_with_precedence_and_zoning(pop_size, generations, precedence_constraints_line1, precedence_constraints_line2):
-    initial_assignment = assign_tasks_by_precedence()
-    population = initialize_population_with_precedence(pop_size, initial_assignment, precedence_constraints_line1, precedence_constraints_line2)
+def elite_indices(fitness_scores, elite_size=2):
+    return np.argsort(fitness_scores)[:elite_size]
 
-    for generation in range(generations):
-        fitness_scores = np.array([fitness_with_robot(individual, main.processing_times, main.robot_density) for individual in population])
+# Memetic step: steepest descent that moves one task off the bottleneck station per step, choosing the
+# feasible reassignment (from the instance's MoveIndex) with the lowest cycle time, ties broken by the
+# flattest adjusted loads; every candidate is scored from the station loads alone. Stops at a local
+# optimum or after max_steps; returns the improved individual, its loads and the moves evaluated
+def steepest_descent(instance, individual, station_loads, max_steps=20):
+    factors = robot_factors(instance.layout)
+    individual, station_loads = individual.copy(), np.asarray(station_loads, dtype=float).copy()
+    n_stations = len(station_loads)
+    targets = np.arange(n_stations)
+    evaluated = 0
+    for _ in range(max_steps):
+        adjusted = station_loads * factors
+        current = (adjusted.max(), (adjusted ** 2).sum())
+        bottleneck = int(np.argmax(adjusted))
+        tasks = np.flatnonzero(individual == bottleneck)
+        feasible = instance.move_index.feasible_moves(individual, tasks)
+        if instance.station_mask is not None:
+            feasible &= instance.station_mask[tasks]
+        if not feasible.any():
+            break
+
+        # Loads after moving each task (rows) to each station (columns)
+        moved_loads = np.tile(station_loads, (len(tasks), n_stations, 1))
+        moved_loads[:, :, bottleneck] -= task_station_times(instance.task_times, tasks, bottleneck)[:, np.newaxis]
+        moved_loads[:, targets, targets] += task_station_times(instance.task_times, tasks[:, np.newaxis], targets)
+        moved_adjusted = moved_loads * factors
+        cycle_times = np.where(feasible, moved_adjusted.max(axis=-1), np.inf)
+        spread = np.where(feasible, (moved_adjusted ** 2).sum(axis=-1), np.inf)
+        evaluated += int(feasible.sum())
 
-        # Selection using tournament
-        selected = tournament_selection(population, fitness_scores)
+        best_cycle_time = cycle_times.min()
+        row, target = np.unravel_index(np.argmin(np.where(cycle_times <= best_cycle_time + 1e-9, spread, np.inf)),
+                                       cycle_times.shape)
+        # Lexicographic: a lower cycle time, or the same one with flatter loads; spread strictly falls, so it ends
+        worse = best_cycle_time > current[0] + 1e-9 or (best_cycle_time >= current[0] - 1e-9 and
+                                                        spread[row, target] >= current[1] - 1e-9)
+        if worse:
+            break  # Local optimum
+        individual[tasks[row]] = target
+        station_loads = moved_loads[row, target]
+    return individual, station_loads, evaluated
 
-        # Generate next generation with precedence-respecting crossover
-        next_generation = []
+# Apply the memetic step to the n_elites best individuals in place, updating their scores (and loads)
+def improve_elites(instance, population, fitness_scores, n_elites, station_loads=None, timer=None):
+    elites = elite_indices(fitness_scores, n_elites)
+    if station_loads is not None:
+        elite_loads = station_loads[elites]
+    else:
+        elite_loads = station_loads_population(population[elites], instance.task_times, instance.number_of_stations)
+    for k, elite in enumerate(elites):
+        population[elite], loads, evaluated = steepest_descent(instance, population[elite], elite_loads[k])
+        fitness_scores[elite] = cycle_times_from_loads(loads, instance.layout)
+        if station_loads is not None:
+            station_loads[elite] = loads
+        if timer is not None:
+            timer.count('move_evaluations', evaluated)
+
+# One generation: selection, crossover, mutation, zoning repair and elitism. In incremental mode
+# (station_loads given) every individual carries its load vector and operators only update the
+# stations they touch; returns the next generation and its loads (None when not incremental).
+# An optional StageTimer accumulates the time spent in each stage and counts rejected offspring,
+# failed mutations and zoning repairs
+def evolve_generation(instance, population, fitness_scores, station_loads=None, timer=None, mutation_rate=0.2,
+                      tournament_size=3, elite_size=2, rng=None):
+    rng = random if rng is None else rng
+    precedence_index_line1 = instance.precedence_index_line1
+    precedence_index_line2 = instance.precedence_index_line2
+    incremental = station_loads is not None
+
+    # Selection using tournament
+    with stage(timer, 'selection'):
+        winners = tournament_selection_indices(fitness_scores, tournament_size, rng)
+        selected = population[winners]
+        selected_loads = station_loads[winners] if incremental else None
+
+    # Generate next generation with precedence-respecting crossover
+    with stage(timer, 'crossover'):
+        next_generation, next_loads = [], []
         for i in range(0, len(selected), 2):
-            parent1 = selected[i]
-            parent2 = selected[i + 1] if i + 1 < len(selected) else selected[0]
-            offspring1, offspring2 = single_point_crossover_with_precedence(
-                parent1, parent2, precedence_constraints_line1, precedence_constraints_line2)
+            j = i + 1 if i + 1 < len(selected) else 0
+            if incremental:
+                offspring1, offspring2, loads1, loads2 = single_point_crossover_with_precedence(
+                    selected[i], selected[j], precedence_index_line1, precedence_index_line2,
+                    (selected_loads[i], selected_loads[j]), instance.task_times, timer, rng)
+                next_loads += [loads1, loads2]
+            else:
+                offspring1, offspring2 = single_point_crossover_with_precedence(
+                    selected[i], selected[j], precedence_index_line1, precedence_index_line2, timer=timer, rng=rng)
             next_generation.append(offspring1)
             next_generation.append(offspring2)
 
-        # Mutation with precedence-respecting mutation
-        for individual in next_generation:
-            if random.random() < 0.2:
-                individual[:] = swap_mutation_with_precedence(
-                    individual, precedence_constraints_line1, precedence_constraints_line2)
+    # Mutation with precedence-respecting mutation
+    with stage(timer, 'mutation'):
+        for k, individual in enumerate(next_generation):
+            if rng.random() < mutation_rate:
+                if incremental:
+                    individual[:], next_loads[k] = swap_mutation_with_precedence(
+                        individual, precedence_index_line1, precedence_index_line2,
+                        station_loads=next_loads[k], processing_times=instance.task_times, timer=timer, rng=rng,
+                        station_mask=instance.station_mask)
+                else:
+                    individual[:] = swap_mutation_with_precedence(
+                        individual, precedence_index_line1, precedence_index_line2, timer=timer, rng=rng,
+                        station_mask=instance.station_mask)
 
-        # Apply zoning constraints
-        next_generation = apply_zoning_constraints(next_generation, precedence_constraints_line1, precedence_constraints_line2)
-
-        # Apply elitism
-        elites = elitism_selection(population, fitness_scores)
+    # Apply zoning constraints; only rows the repair changed are re-scored from scratch
+    with stage(timer, 'zoning'):
         next_generation = np.array(next_generation)
-        next_generation[:len(elites)] = elites
+        before_repair = next_generation.copy() if incremental or timer is not None else None
+        next_generation = repair_zoning_population(next_generation, instance.zoning_index, instance.station_mask)
+        if before_repair is not None:
+            changed = (next_generation != before_repair).any(axis=1)
+        if timer is not None:
+            timer.count('zoning_repairs', int(changed.sum()))
+        if incremental:
+            next_loads = np.array(next_loads)
+            if changed.any():
+                next_loads[changed] = station_loads_population(
+                    next_generation[changed], instance.task_times, instance.number_of_stations)
+
+    # Apply elitism
+    with stage(timer, 'selection'):
+        elites = elite_indices(fitness_scores, elite_size)
+        next_generation[:len(elites)] = population[elites]
+        if incremental:
+            next_loads[:len(elites)] = station_loads[elites]
+            return next_generation, next_loads
+        return next_generation, None
+
+# Evolve an existing population for up to a number of generations; an optional StoppingCriteria ends it early
+# and local_search_elites > 0 adds the memetic step on that many elites each generation. operator_options
+# (mutation_rate, tournament_size, elite_size) go to evolve_generation
+def evolve_population(instance, population, generations, fitness_cache=None, incremental=False, timer=None,
+                      stopping=None, local_search_elites=0, rng=None, **operator_options):
+    station_loads = None
+    if incremental:
+        station_loads = station_loads_population(population, instance.task_times, instance.number_of_stations)
+    for generation in range(generations):
+        with stage(timer, 'fitness'):
+            if incremental:
+                fitness_scores = cycle_times_from_loads(station_loads, instance.layout)
+            else:
+                fitness_scores = cached_fitness_population(population, instance.task_times, instance.layout, fitness_cache)
+        if local_search_elites:
+            with stage(timer, 'local_search'):
+                fitness_scores = np.array(fitness_scores, dtype=float)
+                improve_elites(instance, population, fitness_scores, local_search_elites, station_loads, timer)
+        if timer is not None:
+            timer.count('evaluations', len(population))
+            timer.record_generation(generation, population, fitness_scores)
+        if stopping is not None and stopping.update(fitness_scores):
+            break
+        population, station_loads = evolve_generation(instance, population, fitness_scores, station_loads, timer,
+                                                      rng=rng, **operator_options)
+    return population
+
+# Starting population of the GA
+def initial_population(instance, pop_size, timer=None, rng=None):
+    with stage(timer, 'init'):
+        initial_assignment = assign_tasks_by_precedence(instance)
+        return initialize_population_topological(instance, pop_size, initial_assignment, rng=rng)
 
-        # Update population
-        population = next_generation
+# Genetic Algorithm. Every random draw of the GA comes from rng (a random.Random, one per run so runs can
+# share a process or thread), or from the random module when rng is None
+def genetic_algorithm_with_precedence_and_zoning(instance, pop_size, generations, fitness_cache=None, incremental=False,
+                                                 timer=None, stopping=None, local_search_elites=0, rng=None,
+                                                 **operator_options):
+    if stopping is not None:
+        stopping.start(instance)
+    population = initial_population(instance, pop_size, timer, rng)
+    population = evolve_population(instance, population, generations, fitness_cache, incremental, timer, stopping,
+                                   local_search_elites, rng, **operator_options)
 
     # Get the best solution
-    best_index = np.argmin([fitness_with_robot(individual, main.processing_times, main.robot_density) for individual in population])
-    return population[best_index]
\ No newline at end of file
+    with stage(timer, 'fitness'):
+        best_index = np.argmin(cached_fitness_population(population, instance.task_times, instance.layout, fitness_cache))
+    if timer is not None:
+        timer.count('evaluations', len(population))
+    return population[best_index]
@@ -1,136 +1,200 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')  # Headless: figures are written to files, never shown
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from main import folder_results
 
-def generate_graphs():
-    # Extract data
-    folders = [result['folder'] for result in folder_results]
-    cycle_times = [result['cycle_time'] for result in folder_results]
-    positive_zoning_percentages = [result['positive_zoning_percentage'] for result in folder_results]
-    negative_zoning_percentages = [result['negative_zoning_percentage'] for result in folder_results]
-
-    # Bar Chart: Cycle Time
-    plt.figure(figsize=(10, 5))
-    plt.bar(folders, cycle_times, color='skyblue')
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+# Save a figure in every requested format and release it
+def _save(fig, path_stem, formats):
+    fig.tight_layout()
+    for fmt in formats:
+        fig.savefig(f"{path_stem}.{fmt}")
+    plt.close(fig)
+
+# Bar Chart: Cycle Time
+def render_cycle_time_bar(data, path_stem, formats):
+    fig = plt.figure(figsize=(10, 5))
+    plt.bar(data['folders'], data['cycle_times'], color='skyblue')
     plt.xlabel('Folders')
     plt.ylabel('Cycle Time')
     plt.title('Cycle Time for Each Folder')
-    plt.show()
+    _save(fig, path_stem, formats)
 
-    # Line Graph: Cycle Time
-    plt.figure(figsize=(10, 5))
-    plt.plot(folders, cycle_times, marker='o', linestyle='-', color='blue', label='Cycle Time')
+# Line Graph: Cycle Time
+def render_cycle_time_line(data, path_stem, formats):
+    fig = plt.figure(figsize=(10, 5))
+    plt.plot(data['folders'], data['cycle_times'], marker='o', linestyle='-', color='blue', label='Cycle Time')
     plt.xlabel('Folders')
     plt.ylabel('Cycle Time')
     plt.title('Cycle Time Trend Across Folders')
     plt.legend()
     plt.grid(True)
-    plt.show()
+    _save(fig, path_stem, formats)
 
-    # Bar Chart: Zoning Constraint Satisfaction
-    x = np.arange(len(folders))
+# Bar Chart: Zoning Constraint Satisfaction
+def render_zoning_bar(data, path_stem, formats):
+    x = np.arange(len(data['folders']))
     bar_width = 0.35
-    plt.figure(figsize=(12, 6))
-    plt.bar(x - bar_width / 2, positive_zoning_percentages, width=bar_width, label='Positive Zoning %', color='lightgreen')
-    plt.bar(x + bar_width / 2, negative_zoning_percentages, width=bar_width, label='Negative Zoning %', color='salmon')
+    fig = plt.figure(figsize=(12, 6))
+    plt.bar(x - bar_width / 2, data['positive'], width=bar_width, label='Positive Zoning %', color='lightgreen')
+    plt.bar(x + bar_width / 2, data['negative'], width=bar_width, label='Negative Zoning %', color='salmon')
     plt.xlabel('Folders')
     plt.ylabel('Zoning Constraint Percentage')
     plt.title('Zoning Constraint Satisfaction for Each Folder')
-    plt.xticks(x, folders, rotation=45, ha='right')
+    plt.xticks(x, data['folders'], rotation=45, ha='right')
     plt.legend()
-    plt.tight_layout()
-    plt.show()
+    _save(fig, path_stem, formats)
 
-    # Line Graph: Zoning Constraint Satisfaction
-    plt.figure(figsize=(10, 5))
-    plt.plot(folders, positive_zoning_percentages, marker='o', linestyle='-', color='green', label='Positive Zoning %')
-    plt.plot(folders, negative_zoning_percentages, marker='o', linestyle='--', color='red', label='Negative Zoning %')
+# Line Graph: Zoning Constraint Satisfaction
+def render_zoning_line(data, path_stem, formats):
+    fig = plt.figure(figsize=(10, 5))
+    plt.plot(data['folders'], data['positive'], marker='o', linestyle='-', color='green', label='Positive Zoning %')
+    plt.plot(data['folders'], data['negative'], marker='o', linestyle='--', color='red', label='Negative Zoning %')
     plt.xlabel('Folders')
     plt.ylabel('Zoning Constraint Percentage')
     plt.title('Zoning Constraint Trends Across Folders')
     plt.legend()
     plt.grid(True)
-    plt.show()
-
-    # Gantt Chart: Task Assignments
+    _save(fig, path_stem, formats)
+
+# Gantt Chart: Task Assignments, one barh call per station
+def render_gantt(data, path_stem, formats):
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    # Stations in order of first appearance
+    station_labels = list(dict.fromkeys(task['station'] for task in data['tasks']))
+    for row, station in enumerate(station_labels):
+        tasks = [task for task in data['tasks'] if task['station'] == station]
+        ax.barh(row, [task['duration'] for task in tasks], left=[task['start'] for task in tasks],
+                color=f"C{station % 10}", edgecolor='black')
+
+    # Set custom y-ticks for station names
+    ax.set_yticks(range(len(station_labels)))
+    ax.set_yticklabels([f"Station {station}" for station in station_labels])
+
+    # Add horizontal grid lines for separation
+    for y in range(len(station_labels)):
+        ax.axhline(y=y - 0.5, color='gray', linestyle='--', linewidth=0.5, alpha=0.7)
+
+    # Customize the grid for x-axis (time)
+    ax.grid(True, axis='x', linestyle='--', linewidth=0.5, alpha=0.7)  # Only x-axis gridlines
+    ax.set_axisbelow(True)  # Ensure gridlines are behind bars
+
+    # Chart labels and title
+    ax.set_xlabel('Time')
+    ax.set_ylabel('Stations')
+    ax.set_title(f"Gantt Chart: {data['folder']}")
+    _save(fig, path_stem, formats)
+
+# Pie chart over labelled values
+def render_pie(data, path_stem, formats):
+    fig = plt.figure(figsize=(6, 6))
+    plt.pie(data['values'], labels=data['labels'], autopct='%1.1f%%', colors=data.get('colors'), startangle=140)
+    plt.title(data['title'])
+    _save(fig, path_stem, formats)
+
+RENDERERS = {
+    'cycle_time_bar': render_cycle_time_bar,
+    'cycle_time_line': render_cycle_time_line,
+    'zoning_bar': render_zoning_bar,
+    'zoning_line': render_zoning_line,
+    'gantt': render_gantt,
+    'pie': render_pie
+}
+
+# Worker entry point: render one figure
+def render_job(job):
+    renderer, data, path_stem, formats = job
+    RENDERERS[renderer](data, path_stem, formats)
+    return path_stem
+
+# Every figure of the report as (file stem, renderer, plain input data)
+def report_jobs(folder_results):
+    folders = [result['folder'] for result in folder_results]
+    cycle_times = [result['cycle_time'] for result in folder_results]
+    positive_zoning_percentages = [result['positive_zoning_percentage'] for result in folder_results]
+    negative_zoning_percentages = [result['negative_zoning_percentage'] for result in folder_results]
+    zoning = {'folders': folders, 'positive': positive_zoning_percentages, 'negative': negative_zoning_percentages}
+
+    jobs = [
+        ('cycle_time_bar', 'cycle_time_bar', {'folders': folders, 'cycle_times': cycle_times}),
+        ('cycle_time_line', 'cycle_time_line', {'folders': folders, 'cycle_times': cycle_times}),
+        ('zoning_bar', 'zoning_bar', zoning),
+        ('zoning_line', 'zoning_line', zoning)
+    ]
     for result in folder_results:
-        tasks = result['task_assignments']
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        station_labels = []
-        station_indices = []
-
-        # Collect stations and labels
-        for task in tasks:
-            station = task['station']
-            if station not in station_labels:
-                station_labels.append(station)
-                station_indices.append(len(station_labels) - 1)
-
-            ax.barh(
-                station_labels.index(station),
-                task['duration'],
-                left=task['start'],
-                color=f"C{station % 10}",
-                edgecolor='black',
-                label=f"Task {task['task']}" if f"Task {task['task']}" not in ax.get_legend_handles_labels()[1] else None
-            )
-
-        # Set custom y-ticks for station names
-        ax.set_yticks(range(len(station_labels)))
-        ax.set_yticklabels([f"Station {station}" for station in station_labels])
-
-        # Add horizontal grid lines for separation
-        for y in range(len(station_labels)):
-            ax.axhline(y=y - 0.5, color='gray', linestyle='--', linewidth=0.5, alpha=0.7)
-
-        # Customize the grid for x-axis (time)
-        ax.grid(True, axis='x', linestyle='--', linewidth=0.5, alpha=0.7)  # Only x-axis gridlines
-        ax.set_axisbelow(True)  # Ensure gridlines are behind bars
-
-        # Chart labels and title
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Stations')
-        ax.set_title(f"Gantt Chart: {result['folder']}")
-
-        plt.tight_layout()
-        plt.show()
-
-    # Pie chart for Cycle Times
-    plt.figure(figsize=(6, 6))
-    plt.pie(cycle_times, labels=folders, autopct='%1.1f%%', startangle=140)
-    plt.title("Cycle Time Distribution")
-    plt.show()
-
-    # Pie chart for Zoning Compliance
-    plt.figure(figsize=(6, 6))
-    plt.pie([sum(positive_zoning_percentages), sum(negative_zoning_percentages)],
-          labels=['Total Positive Zoning', 'Total Negative Zoning'],
-          autopct='%1.1f%%', colors=['green', 'red'], startangle=140)
-    plt.title("Zoning Compliance Percentage")
-    plt.show()
-
-    # Pie chart for positive Zoning Compliance
-    plt.figure(figsize=(6, 6))
-    plt.pie(positive_zoning_percentages, labels=folders,
-          autopct='%1.1f%%',startangle=140)
-    plt.title("Positive Zoning Compliance Percentages")
-    plt.show()
-
-    # Pie chart for negative Zoning Compliance
-    plt.figure(figsize=(6, 6))
-    plt.pie(negative_zoning_percentages, labels=folders,
-          autopct='%1.1f%%',startangle=140)
-    plt.title("negative Zoning Compliance Percentages")
-    plt.show()
-
+        jobs.append((f"gantt_{result['folder']}", 'gantt', {'folder': result['folder'], 'tasks': result['task_assignments']}))
+
+    pies = [
+        ('pie_cycle_time', {'values': cycle_times, 'labels': folders, 'title': "Cycle Time Distribution"}),
+        ('pie_zoning_compliance', {'values': [sum(positive_zoning_percentages), sum(negative_zoning_percentages)],
+                                   'labels': ['Total Positive Zoning', 'Total Negative Zoning'],
+                                   'colors': ['green', 'red'], 'title': "Zoning Compliance Percentage"}),
+        ('pie_positive_zoning', {'values': positive_zoning_percentages, 'labels': folders,
+                                 'title': "Positive Zoning Compliance Percentages"}),
+        ('pie_negative_zoning', {'values': negative_zoning_percentages, 'labels': folders,
+                                 'title': "negative Zoning Compliance Percentages"})
+    ]
+    jobs.extend((stem, 'pie', data) for stem, data in pies if sum(data['values']) > 0)  # Matplotlib rejects all-zero pies
+    return jobs
+
+# Headless report: figures rendered in worker processes (skipping those whose inputs have not changed)
+# plus a results table, all written to output_dir
+def generate_graphs(folder_results, output_dir='reports', formats=('png', 'svg'), max_workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Input hash of every figure rendered so far
+    hashes_path = os.path.join(output_dir, '.render_hashes.json')
+    rendered = {}
+    if os.path.exists(hashes_path):
+        with open(hashes_path) as f:
+            rendered = json.load(f)
+
+    pending, hashes = [], {}
+    for stem, renderer, data in report_jobs(folder_results):
+        path_stem = os.path.join(output_dir, stem)
+        hashes[stem] = hashlib.sha256(json.dumps([renderer, data, list(formats)], sort_keys=True,
+                                                 default=_json_default).encode()).hexdigest()
+        up_to_date = rendered.get(stem) == hashes[stem] and all(os.path.exists(f"{path_stem}.{fmt}") for fmt in formats)
+        if not up_to_date:
+            pending.append((renderer, data, path_stem, tuple(formats)))
+
+    if max_workers == 1 or len(pending) <= 1:
+        for job in pending:
+            render_job(job)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(render_job, pending))
+
+    rendered.update(hashes)
+    with open(hashes_path, 'w') as f:
+        json.dump(rendered, f, indent=2, sort_keys=True)
+    print(f"Report figures: {len(pending)} rendered, {len(hashes) - len(pending)} unchanged, in {output_dir}")
 
     #table for comparison
     df = pd.DataFrame({
-        "Dataset Names": folders,
-        "Cycle Time": cycle_times,
-        "Positive Zoning %": positive_zoning_percentages,
-        "Negative Zoning %": negative_zoning_percentages
+        "Dataset Names": [result['folder'] for result in folder_results],
+        "Cycle Time": [result['cycle_time'] for result in folder_results],
+        "Positive Zoning %": [result['positive_zoning_percentage'] for result in folder_results],
+        "Negative Zoning %": [result['negative_zoning_percentage'] for result in folder_results]
     })
-    print(df.to_string(index=False))
\ No newline at end of file
+    df.to_csv(os.path.join(output_dir, 'results.csv'), index=False)
+    try:
+        df.to_parquet(os.path.join(output_dir, 'results.parquet'), index=False)
+    except ImportError:  # Parquet needs the optional pyarrow or fastparquet engine
+        pass
+    print(df.to_string(index=False))
+    return df
@@ -0,0 +1,88 @@
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from dataset_loader import iter_zip_instances
+from file_handles import PrecedenceIndex, ZoningIndex
+from problem_instance import ProblemInstance
+
+DEFAULT_CACHE_DIR = ".instance_cache"
+CACHE_FORMAT = 2  # Part of the cache directory name; bumped whenever the stored arrays change
+
+# Content hash of the source archive; the cache is rebuilt whenever it changes
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Directory holding the cache of one archive version
+def cache_path(zip_path, cache_dir=DEFAULT_CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(zip_path))[0]
+    return os.path.join(cache_dir, f"{stem}-v{CACHE_FORMAT}-{file_hash(zip_path)[:16]}")
+
+# Parse every instance of the archive once and store its arrays as .npy files (memory-mappable): the
+# processing times of both lines concatenated, the precedence edge arrays and the zoning matrices
+def build_instance_cache(zip_path, cache_dir=DEFAULT_CACHE_DIR):
+    path = cache_path(zip_path, cache_dir)
+    if os.path.exists(os.path.join(path, 'manifest.json')):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir)
+    names, tasks_nt1 = [], {}
+    for instance in iter_zip_instances(zip_path):
+        instance_dir = os.path.join(staging, instance.name)
+        os.makedirs(instance_dir)
+        arrays = {
+            'processing_times': instance.processing_times,
+            'precedence_line1': instance.precedence_index_line1.edges,
+            'precedence_line2': instance.precedence_index_line2.edges,
+            'zoned': instance.zoning_index.zoned,
+            'swap': instance.zoning_index.swap
+        }
+        for array_name, array in arrays.items():
+            np.save(os.path.join(instance_dir, f"{array_name}.npy"), array)
+        names.append(instance.name)
+        tasks_nt1[instance.name] = instance.tasks_nt1
+
+    # The manifest is written last, so a directory without one is an unfinished build
+    with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+        json.dump({'source': os.path.abspath(zip_path), 'instances': names, 'tasks_nt1': tasks_nt1}, f, indent=2)
+    try:
+        os.replace(staging, path)
+    except OSError:  # Another process finished the same build first
+        shutil.rmtree(staging, ignore_errors=True)
+    return path
+
+# Yield instances from the cache (built on first use). Times, edge arrays and zoning matrices stay
+# memory-mapped read-only: the instance and its precedence indices work on the mapped arrays directly
+def iter_cached_instances(zip_path, cache_dir=DEFAULT_CACHE_DIR, names=None, pattern=None,
+                          number_of_stations=3, robot_density=(0, 1, 1)):
+    path = build_instance_cache(zip_path, cache_dir)
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    names = set(names) if names is not None else None
+    for name in manifest['instances']:
+        if names is not None and name not in names:
+            continue
+        if pattern is not None and not fnmatch.fnmatch(name, pattern):
+            continue
+
+        def load(array_name):
+            return np.load(os.path.join(path, name, f"{array_name}.npy"), mmap_mode='r')
+
+        processing_times = load('processing_times')
+        tasks_nt1 = manifest['tasks_nt1'][name]
+        precedence_index_line1 = PrecedenceIndex(load('precedence_line1'), 0, tasks_nt1)
+        precedence_index_line2 = PrecedenceIndex(load('precedence_line2'), tasks_nt1, len(processing_times))
+        zoning_index = ZoningIndex.from_matrices(
+            np.concatenate((precedence_index_line1.edges, precedence_index_line2.edges)), tasks_nt1,
+            load('zoned'), load('swap'))
+        yield ProblemInstance.from_arrays(name, processing_times, tasks_nt1, precedence_index_line1,
+                                          precedence_index_line2, zoning_index, number_of_stations, robot_density)
@@ -0,0 +1,98 @@
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ga_algo import fitness_population, initial_population, evolve_population
+from fitness_cache import FitnessCache
+
+TOPOLOGIES = ('ring', 'fully_connected', 'random')
+
+# Source islands each island receives migrants from
+def migration_sources(topology, n_islands, rng):
+    if topology == 'ring':
+        return [[(k - 1) % n_islands] for k in range(n_islands)]
+    if topology == 'fully_connected':
+        return [[source for source in range(n_islands) if source != k] for k in range(n_islands)]
+    if topology == 'random':
+        return [[rng.choice([source for source in range(n_islands) if source != k])] for k in range(n_islands)]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+# Worker: evolve one island until the next migration, with its own RNG seed, incremental loads or a fitness
+# cache (one per epoch, as the worker process changes) as solve_instance sets them
+def evolve_island(instance, population, pop_size, generations, seed, local_search_elites=0, operator_options=None,
+                  fitness_cache_size=0, incremental=False):
+    rng = random.Random(seed)
+    if population is None:
+        population = initial_population(instance, pop_size, rng=rng)
+    fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size else None
+    return evolve_population(instance, population, generations, fitness_cache, incremental,
+                             local_search_elites=local_search_elites, rng=rng, **(operator_options or {}))
+
+# Replace the worst individuals of every island with the elites of its source islands
+def migrate(populations, fitness, sources, migration_size):
+    elites = [population[np.argsort(scores)[:migration_size]] for population, scores in zip(populations, fitness)]
+    migrated, received = [], []
+    for population, scores, island_sources in zip(populations, fitness, sources):
+        immigrants = np.concatenate([elites[source] for source in island_sources])
+        immigrants = immigrants[:max(len(population) - migration_size, 0)]  # Never displace the island's own elites
+        population = population.copy()
+        if len(immigrants):
+            population[np.argsort(scores)[len(population) - len(immigrants):]] = immigrants
+        migrated.append(population)
+        received.append(len(immigrants))
+    return migrated, received
+
+# Island-model GA: sub-populations evolve in separate processes and exchange elites every migration_interval generations.
+# An optional StoppingCriteria is checked at every migration, so it ends the run at epoch granularity
+def run_island_model(instance, n_islands=4, pop_size=10, generations=50, migration_interval=10, migration_size=2,
+                     topology='ring', seed=None, max_workers=None, stopping=None, local_search_elites=0,
+                     fitness_cache_size=0, incremental=False, **operator_options):
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {topology}")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be at least 1")
+    rng = random.Random(seed)
+    island_seeds = [rng.randrange(2 ** 32 - migration_interval - generations) for _ in range(n_islands)]
+    populations = [None] * n_islands
+    island_stats = [{'island': k, 'seed': island_seeds[k], 'best_fitness_history': [], 'migrants_received': 0}
+                    for k in range(n_islands)]
+
+    if stopping is not None:
+        stopping.start(instance)
+    completed = 0
+    with ProcessPoolExecutor(max_workers=max_workers or n_islands) as executor:
+        while True:
+            epoch_generations = min(migration_interval, generations - completed)
+            futures = [executor.submit(evolve_island, instance, populations[k], pop_size, epoch_generations,
+                                       island_seeds[k] + completed, local_search_elites, operator_options,
+                                       fitness_cache_size, incremental)
+                       for k in range(n_islands)]
+            populations = [future.result() for future in futures]
+            completed += epoch_generations
+
+            fitness = [fitness_population(population, instance.task_times, instance.layout)
+                       for population in populations]
+            for stats, scores in zip(island_stats, fitness):
+                stats['best_fitness_history'].append(float(scores.min()))
+
+            if stopping is not None and stopping.update(np.concatenate(fitness), epoch_generations):
+                break
+            if completed >= generations:
+                break
+            if n_islands > 1:
+                sources = migration_sources(topology, n_islands, rng)
+                populations, received = migrate(populations, fitness, sources, migration_size)
+                for stats, count in zip(island_stats, received):
+                    stats['migrants_received'] += count
+
+    for stats, scores in zip(island_stats, fitness):
+        stats['best_fitness'] = float(scores.min())
+        stats['mean_fitness'] = float(scores.mean())
+
+    best_island = int(np.argmin([stats['best_fitness'] for stats in island_stats]))
+    best_solution = populations[best_island][np.argmin(fitness[best_island])]
+    return {
+        'best_solution': best_solution,
+        'best_fitness': island_stats[best_island]['best_fitness'],
+        'best_island': best_island,
+        'islands': island_stats
+    }
@@ -1,37 +1,86 @@
-import os
+import argparse
 
-# Global Variables
-tasks_nt1 = 0
-tasks_nt2 = 0
-total_tasks = 0
-processing_times = None
-precedence_order = None
-precedence_mapping = None
-station_assignments = None
-precedence_line1 = None
-precedence_line2 = None
-number_of_stations = 3
-folder_results = []
-robot_density = [0, 1, 1]  # 0 indicates no robot, 1 indicates robot present
-
-# Main function
-def main(zip_file, extract_to):
-    from process_each_folder import process_folder
-    from file_handles import extract_zip
+# Solve the selected instances of a dataset ZIP and write the report; returns the result of every instance.
+# A StationLayout (per-station speed factors and lines served) replaces number_of_stations / robot_density;
+# worker_only_tasks are the 1-based numbers of tasks a robot cannot assist
+def main(zip_file, max_workers=None, instance_names=None, instance_pattern=None, cache_dir=None, report_dir='reports',
+         number_of_stations=3, robot_density=(0, 1, 1), layout=None, worker_only_tasks=None,
+         **solve_options):  # robot_density: 0 no robot, 1 robot present
+    from dataset_loader import iter_zip_instances
+    from instance_cache import iter_cached_instances
     from generate_graphs import generate_graphs
+    from solver import Solver
+    from station_layout import StationLayout, robot_eligibility
 
-    extract_zip(zip_file, extract_to)
-    for folder_name in os.listdir(extract_to):
-        folder_path = os.path.join(extract_to, folder_name)
-        if os.path.isdir(folder_path):
-            process_folder(folder_path)
+    # Instances come from the binary cache when enabled, otherwise parsed straight from the ZIP; only those selected
+    if cache_dir:
+        instances = iter_cached_instances(zip_file, cache_dir, instance_names, instance_pattern, number_of_stations, robot_density)
+    else:
+        instances = iter_zip_instances(zip_file, instance_names, instance_pattern, number_of_stations, robot_density)
+    if layout is not None or worker_only_tasks:
+        layout = layout if layout is not None else StationLayout.from_robot_density(robot_density)
+        instances = (instance.with_layout(layout, robot_eligibility(instance.total_tasks, worker_only_tasks))
+                     for instance in instances)
+    folder_results = Solver(verbose=True, **solve_options).solve_many(instances, max_workers)
 
 # Generate graphs after processing all folders
-    generate_graphs()
+    generate_graphs(folder_results, report_dir, max_workers=max_workers)
+    return folder_results
 
 
 # Run the script
 if __name__ == "__main__":
-    zip_file = "./PALBP_DATASET/PALBP_DATASET/small/PALBP-data-sets.zip"  # Path to the ZIP file
-    extract_to = "./PALBP_DATASET/PALBP_DATASET/small/PALBP-data-sets"  # Directory to extract to
-    main(zip_file, extract_to)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Parallel assembly line balancing with HRC")
+    parser.add_argument("--zip", default="./PALBP_DATASET/PALBP_DATASET/small/PALBP-data-sets.zip", help="dataset ZIP file")
+    parser.add_argument("--instances", nargs="+", default=None, help="only solve these instances (folder names)")
+    parser.add_argument("--pattern", default=None, help="only solve instances matching this glob, e.g. 'BART*'")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU, 1 runs serially)")
+    parser.add_argument("--islands", type=int, default=1, help="island-model GA with this many sub-populations per folder")
+    parser.add_argument("--cache-dir", default=".instance_cache", help="binary instance cache, rebuilt when the ZIP changes")
+    parser.add_argument("--no-cache", action="store_true", help="parse the ZIP on every run")
+    parser.add_argument("--report-dir", default="reports", help="where figures and the results table are written")
+    parser.add_argument("--telemetry-dir", default=None,
+                        help="write per-generation GA telemetry as JSON lines, one file per instance")
+    parser.add_argument("--generations", type=int, default=50, help="generation limit per instance")
+    parser.add_argument("--stagnation", type=int, default=None, help="stop after this many generations without improvement")
+    parser.add_argument("--target-cycle-time", type=float, default=None, help="stop once this cycle time is reached")
+    parser.add_argument("--time-limit", type=float, default=None, help="wall-clock budget per instance, in seconds")
+    parser.add_argument("--stop-at-lower-bound", action="store_true", help="stop once the cycle time lower bound is reached")
+    parser.add_argument("--solver", choices=("ga", "exact", "both"), default="ga",
+                        help="GA, branch-and-bound, or both (reports the GA's optimality gap)")
+    parser.add_argument("--exact-node-limit", type=int, default=None, help="node budget of the branch-and-bound")
+    parser.add_argument("--exact-time-limit", type=float, default=None, help="time budget of the branch-and-bound, in seconds")
+    parser.add_argument("--local-search", type=int, default=0, metavar="N",
+                        help="memetic step: steepest descent off the bottleneck station on the N best individuals per generation")
+    parser.add_argument("--stations", type=int, default=None,
+                        help="number of stations shared by both lines (station 1 worker-only, the rest with a robot)")
+    parser.add_argument("--robot-density", type=int, nargs="+", default=None,
+                        help="per station: 0 worker-only, 1 with a robot, e.g. 0 1 1 (sets the station count)")
+    parser.add_argument("--speed-factors", type=float, nargs="+", default=None,
+                        help="per station robot speed factor in (0, 1], 1 for worker-only (sets the station count)")
+    parser.add_argument("--layout", default=None,
+                        help='JSON layout file, e.g. {"shared": [0.7], "line1": [1, 0.7], "line2": [0.8], '
+                             '"worker_only_tasks": [3, 12]}: speed factors of the stations of both lines and of each line')
+    parser.add_argument("--worker-only-tasks", type=int, nargs="+", default=None,
+                        help="1-based numbers of tasks a robot cannot assist (line 1 tasks first, then line 2)")
+    args = parser.parse_args()
+    if args.islands > 1 and args.telemetry_dir:
+        parser.error("--telemetry-dir is not available with --islands > 1")
+
+    from station_layout import StationLayout, load_layout
+    layout, worker_only_tasks = None, args.worker_only_tasks or []
+    if args.layout:
+        layout, layout_worker_only_tasks = load_layout(args.layout)
+        worker_only_tasks = sorted(set(worker_only_tasks) | set(layout_worker_only_tasks))
+    elif args.speed_factors:
+        layout = StationLayout(args.speed_factors)
+    robot_density = args.robot_density
+    if robot_density is None:
+        robot_density = [0] + [1] * ((args.stations or 3) - 1)
+
+    main(args.zip, args.workers, args.instances, args.pattern, None if args.no_cache else args.cache_dir, args.report_dir,
+         len(robot_density), robot_density, layout, worker_only_tasks,
+         islands=args.islands, telemetry_dir=args.telemetry_dir, generations=args.generations, stagnation_generations=args.stagnation,
+         target_cycle_time=args.target_cycle_time, time_limit=args.time_limit, stop_at_lower_bound=args.stop_at_lower_bound,
+         solver=args.solver, exact_node_limit=args.exact_node_limit, exact_time_limit=args.exact_time_limit,
+         local_search_elites=args.local_search)
@@ -0,0 +1,134 @@
+import copy
+import os
+import random
+import numpy as np
+from file_handles import (read_precedence, read_processing_times, PrecedenceIndex, ZoningIndex, MoveIndex,
+                          pickle_memmaps, unpickle_memmaps)
+from station_layout import StationLayout, task_times_matrix
+
+# Self-contained PALBP instance: data, station layout and compiled indices, no module globals.
+# The stations come from a StationLayout when given, otherwise from number_of_stations and robot_density
+# (stations shared by both lines, robots at the default speed factor). robot_eligible marks, per task, whether
+# a robot can assist it; tasks it cannot take their full time on every station
+class ProblemInstance:
+    def __init__(self, name, precedence_constraints_line1, precedence_constraints_line2,
+                 processing_times_nt1, processing_times_nt2, number_of_stations=3, robot_density=(0, 1, 1),
+                 zoning_index=None, layout=None, robot_eligible=None):
+        tasks_nt1 = len(processing_times_nt1)
+        processing_times = np.concatenate((processing_times_nt1, processing_times_nt2))
+        self._setup(name, processing_times, tasks_nt1,
+                    PrecedenceIndex(precedence_constraints_line1, 0, tasks_nt1),
+                    PrecedenceIndex(precedence_constraints_line2, tasks_nt1, len(processing_times)),
+                    zoning_index, number_of_stations, robot_density, layout, robot_eligible)
+
+    # Instance over arrays and indices as they are, e.g. memory-mapped from the instance cache: the times of
+    # both lines concatenated (tasks_nt1 of them on line 1) and the PrecedenceIndex of each line. Nothing is
+    # copied; only the MoveIndex, which depends on the stations, is built
+    @classmethod
+    def from_arrays(cls, name, processing_times, tasks_nt1, precedence_index_line1, precedence_index_line2,
+                    zoning_index=None, number_of_stations=3, robot_density=(0, 1, 1), layout=None, robot_eligible=None):
+        instance = cls.__new__(cls)
+        instance._setup(name, processing_times, tasks_nt1, precedence_index_line1, precedence_index_line2,
+                        zoning_index, number_of_stations, robot_density, layout, robot_eligible)
+        return instance
+
+    def _setup(self, name, processing_times, tasks_nt1, precedence_index_line1, precedence_index_line2,
+               zoning_index, number_of_stations, robot_density, layout, robot_eligible):
+        self.name = name
+        self.tasks_nt1 = tasks_nt1
+        self.tasks_nt2 = len(processing_times) - tasks_nt1
+        self.total_tasks = len(processing_times)
+        self.processing_times = processing_times
+        if layout is None:
+            if len(robot_density) != number_of_stations:
+                raise ValueError(f"robot_density has {len(robot_density)} entries for {number_of_stations} stations")
+            layout = StationLayout.from_robot_density(robot_density)
+        self.layout = layout
+        self.number_of_stations = len(layout)
+        self.robot_density = layout.robot_density()  # 0 indicates no robot, 1 indicates robot present
+        self.robot_eligible = None if robot_eligible is None else np.asarray(robot_eligible, dtype=bool)
+        if self.robot_eligible is not None and len(self.robot_eligible) != self.total_tasks:
+            raise ValueError(f"robot_eligible has {len(self.robot_eligible)} entries for {self.total_tasks} tasks")
+
+        # Times the fitness works with: processing_times, or a (tasks, stations) matrix when some tasks are
+        # manual; and the (tasks, stations) mask of allowed stations, None when every station serves both lines
+        times_matrix = task_times_matrix(self.processing_times, layout, self.robot_eligible)
+        self.task_times = self.processing_times if times_matrix is None else times_matrix
+        self.station_mask = layout.station_mask(self.tasks_nt1, self.total_tasks) if layout.restricts_lines else None
+
+        # Compiled once per instance
+        self.precedence_index_line1 = precedence_index_line1
+        self.precedence_index_line2 = precedence_index_line2
+        # Sized here for every task id and station label, so solves only ever read it
+        zoning_size = max(self.total_tasks + 1, self.number_of_stations)
+        if zoning_index is None:
+            zoning_index = ZoningIndex(self.precedence_constraints_line1, self.precedence_constraints_line2, self.tasks_nt1,
+                                       zoning_size)
+        self.zoning_index = zoning_index.with_size(zoning_size)
+        self.move_index = MoveIndex(self.precedence_index_line1, self.precedence_index_line2, self.number_of_stations)
+
+        # Precedence-matching rule, drawn by randomize_station_assignments
+        self.precedence_order = None
+        self.precedence_mapping = None
+        self.station_assignments = None
+
+    @property
+    def precedence_constraints_line1(self):
+        return self.precedence_index_line1.constraints()
+
+    @property
+    def precedence_constraints_line2(self):
+        return self.precedence_index_line2.constraints()
+
+    # Memory-mapped times go to worker processes by file name (see pickle_memmaps)
+    def __getstate__(self):
+        return pickle_memmaps(self.__dict__, ('processing_times', 'task_times'))
+
+    def __setstate__(self, state):
+        self.__dict__.update(unpickle_memmaps(state, ('processing_times', 'task_times')))
+
+    # The same instance data under another station layout; parsed data and compiled indices are shared
+    def with_stations(self, number_of_stations, robot_density):
+        if len(robot_density) != number_of_stations:
+            raise ValueError(f"robot_density has {len(robot_density)} entries for {number_of_stations} stations")
+        return self.with_layout(StationLayout.from_robot_density(robot_density), self.robot_eligible)
+
+    def with_layout(self, layout, robot_eligible=None):
+        return ProblemInstance.from_arrays(self.name, self.processing_times, self.tasks_nt1, self.precedence_index_line1,
+                                           self.precedence_index_line2, self.zoning_index, layout=layout,
+                                           robot_eligible=robot_eligible)
+
+    # Randomly permute the precedence order and assign a station to every precedence value, drawing from
+    # rng (a random.Random) or from the global random and np.random state when rng is None
+    def randomize_station_assignments(self, rng=None):
+        if rng is None:
+            self.precedence_order = np.random.permutation(np.arange(self.total_tasks, 0, -1))
+            rng = random
+        else:
+            self.precedence_order = np.array(rng.sample(range(self.total_tasks, 0, -1), self.total_tasks))
+        self.precedence_mapping = {value: idx for idx, value in enumerate(self.precedence_order)}
+        if self.station_mask is None:
+            self.station_assignments = {prec: rng.randint(0, self.number_of_stations - 1) for prec in self.precedence_order}
+        else:  # Only stations that serve the line of the task the value lands on
+            allowed = [np.flatnonzero(self.layout.serves[line]).tolist() for line in range(2)]
+            self.station_assignments = {prec: rng.choice(allowed[int(idx >= self.tasks_nt1)])
+                                        for idx, prec in enumerate(self.precedence_order)}
+
+    # Copy with its own random station assignments; the shared data is read-only, so concurrent solves of
+    # one instance never see each other's draws
+    def with_random_station_assignments(self, rng):
+        instance = copy.copy(self)
+        instance.randomize_station_assignments(rng)
+        return instance
+
+# Read the o1/o2/z1/z2 files of one dataset folder
+def load_instance(folder_path, number_of_stations=3, robot_density=(0, 1, 1)):
+    return ProblemInstance(
+        name=os.path.basename(folder_path),
+        precedence_constraints_line1=read_precedence(os.path.join(folder_path, 'o1.txt')),
+        precedence_constraints_line2=read_precedence(os.path.join(folder_path, 'o2.txt')),
+        processing_times_nt1=read_processing_times(os.path.join(folder_path, 'z1.txt')),
+        processing_times_nt2=read_processing_times(os.path.join(folder_path, 'z2.txt')),
+        number_of_stations=number_of_stations,
+        robot_density=robot_density
+    )
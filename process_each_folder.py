@@ -1,124 +1,148 @@
 import os
-import numpy as np
 import random
-from file_handles import read_precedence, read_processing_times
+from contextlib import nullcontext
+import numpy as np
+from problem_instance import load_instance
 from ga_algo import fitness_with_robot,  genetic_algorithm_with_precedence_and_zoning
-import main
+from island_model import run_island_model
+from fitness_cache import FitnessCache
+from profiling import GATelemetry
+from stopping import StoppingCriteria
+from exact_solver import branch_and_bound, optimality_gap
 
 # Process each folder
-def process_folder(folder_path):
-    print(f"Finding best solution for folder: {os.path.basename(folder_path)}")
-
-    o1_path = os.path.join(folder_path, 'o1.txt')
-    o2_path = os.path.join(folder_path, 'o2.txt')
-    z1_path = os.path.join(folder_path, 'z1.txt')
-    z2_path = os.path.join(folder_path, 'z2.txt')
-
-    main.precedence_constraints_line1 = read_precedence(o1_path)
-    main.precedence_constraints_line2 = read_precedence(o2_path)
-    processing_times_nt1 = read_processing_times(z1_path)
-    processing_times_nt2 = read_processing_times(z2_path)
-
-    main.tasks_nt1 = len(processing_times_nt1)
-    main.tasks_nt2 = len(processing_times_nt2)
-    main.total_tasks = main.tasks_nt1 + main.tasks_nt2
-    main.processing_times = np.concatenate((processing_times_nt1, processing_times_nt2))
-    print("\nPrecedence Constraints Line 1:", main.precedence_constraints_line1)
-    print("Precedence Constraints Line 2:", main.precedence_constraints_line2)
-
-    # Randomly permute precedence order
-    main.precedence_order = np.random.permutation(np.arange(main.total_tasks, 0, -1))
-    print("Random Precedence Order:", main.precedence_order)
-
-    # Randomly assign stations to precedence values
-    main.station_assignments = {prec: random.randint(0, main.number_of_stations - 1) for prec in main.precedence_order}
-    print("\nStation Assignments Based on Precedence:", main.station_assignments)
-
-    # Map precedence to task indices for both lines
-    main.precedence_mapping = {value: idx for idx, value in enumerate(main.precedence_order)}
-
-    # Run the Genetic Algorithm
-    best_solution = genetic_algorithm_with_precedence_and_zoning(
-        pop_size=10, generations=50,
-        precedence_constraints_line1=main.precedence_constraints_line1,
-        precedence_constraints_line2=main.precedence_constraints_line2
-    )
-    print("\nBest solution:", best_solution)
-
-    cycle_time = fitness_with_robot(best_solution, main.processing_times, main.robot_density)
-
-    def validate_solution(solution, precedence_constraints, tasks_line_start, tasks_line_end, offset=0):
-        # Extract the relevant segment of the solution
-        line_segment = solution[tasks_line_start:tasks_line_end]
-        # Map tasks to their positions in the segment (adjust for offset if tasks start from 1)
-        task_positions = {task + offset: idx for idx, task in enumerate(line_segment, start=1)}
-
-        for task_a, task_b in precedence_constraints:
-            # Ensure both tasks are part of the current line
-            if task_a in task_positions and task_b in task_positions:
-                # Check precedence relationship
-                if task_positions[task_a] > task_positions[task_b]:
-                    print(f"Precedence violated: Task {task_a} should come before Task {task_b}\n")
-                    return False
-        return True
-
-    #zoning percentage function
-    def zoning_check(task_a, task_b):
-        # Check precedence to determine positive or negative zoning
-        for constraint in main.precedence_constraints_line1 + main.precedence_constraints_line2:
-            if constraint == (task_a, task_b) or constraint == (task_b, task_a):
-                return True  # Positive zoning
-        return False  # Negative zoning
+def process_folder(folder_path, number_of_stations=3, robot_density=(0, 1, 1), **solve_options):
+    return solve_instance(load_instance(folder_path, number_of_stations, robot_density), **solve_options)
+
+def _quiet(*args, **kwargs):
+    pass
+
+# Solve one instance; everything it needs comes from the instance and the arguments, and every random draw
+# from an RNG of its own, so it can run in a worker process, a thread or alongside other solves. The caller's
+# instance is not modified. verbose=False silences the progress output
+def solve_instance(instance, pop_size=10, generations=50, seed=None, islands=1, migration_interval=10, topology='ring',
+                   fitness_cache_size=4096, incremental=False, telemetry_dir=None, stagnation_generations=None,
+                   target_cycle_time=None, time_limit=None, stop_at_lower_bound=False, solver='ga', exact_node_limit=None,
+                   exact_time_limit=None, local_search_elites=0, mutation_rate=0.2, tournament_size=3, elite_size=2,
+                   verbose=True):
+    if solver not in ('ga', 'exact', 'both'):
+        raise ValueError(f"Unknown solver: {solver}")
+    if islands > 1 and telemetry_dir:
+        raise ValueError("Per-generation telemetry is not available for the island model (islands > 1)")
+    rng = random.Random(seed)
+    log = print if verbose else _quiet
+    log(f"Finding best solution for folder: {instance.name}")
+    log("\nPrecedence Constraints Line 1:", instance.precedence_constraints_line1)
+    log("Precedence Constraints Line 2:", instance.precedence_constraints_line2)
+
+    # Randomly permute precedence order and assign stations to precedence values
+    instance = instance.with_random_station_assignments(rng)
+    log("Random Precedence Order:", instance.precedence_order)
+    log("\nStation Assignments Based on Precedence:", instance.station_assignments)
+
+    # Run the Genetic Algorithm, as an island model across processes when asked for
+    island_result = None
+    telemetry = None
+    fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size else None
+    operator_options = {'mutation_rate': mutation_rate, 'tournament_size': tournament_size, 'elite_size': elite_size}
+    stopping = StoppingCriteria(stagnation_generations, target_cycle_time, time_limit, stop_at_lower_bound)
+    if solver == 'exact':  # Branch-and-bound only, no GA
+        best_solution = None
+    elif islands > 1:
+        island_result = run_island_model(instance, n_islands=islands, pop_size=pop_size, generations=generations,
+                                         migration_interval=migration_interval, topology=topology, seed=seed,
+                                         stopping=stopping, local_search_elites=local_search_elites,
+                                         fitness_cache_size=fitness_cache_size, incremental=incremental, **operator_options)
+        best_solution = island_result['best_solution']
+    else:
+        # Per-generation telemetry as JSON lines, one file per instance; closed (with its summary) even if the GA fails
+        if telemetry_dir:
+            os.makedirs(telemetry_dir, exist_ok=True)
+            telemetry = GATelemetry(jsonl_path=os.path.join(telemetry_dir, f"{instance.name}.jsonl"),
+                                    context={'instance': instance.name, 'seed': seed})
+        with telemetry or nullcontext():
+            best_solution = genetic_algorithm_with_precedence_and_zoning(instance, pop_size=pop_size, generations=generations,
+                                                                         fitness_cache=fitness_cache, incremental=incremental,
+                                                                         timer=telemetry, stopping=stopping,
+                                                                         local_search_elites=local_search_elites, rng=rng,
+                                                                         **operator_options)
+
+    # Branch-and-bound, seeded with the GA's best when both run; it proves optimality or bounds the gap
+    exact_result = None
+    if solver != 'ga':
+        ga_solution = best_solution
+        exact_result = branch_and_bound(instance, ga_solution, exact_node_limit, exact_time_limit)
+        best_solution = exact_result['best_solution']
+        log(f"Branch-and-bound: cycle time {exact_result['cycle_time']}, lower bound {exact_result['lower_bound']}, "
+              f"{'optimal' if exact_result['optimal'] else 'not proven optimal'} after {exact_result['nodes']} nodes")
+    log("\nBest solution:", best_solution)
+
+    cycle_time = fitness_with_robot(best_solution, instance.task_times, instance.layout)
 
     # Calculate Zoning Satisfaction Percentage
-    positive_zoning = 0
-    negative_zoning = 0
-    total_zoning = 0
-    for i in range(len(best_solution)):
-      for j in range(i + 1, len(best_solution)):
-        task_a, task_b = best_solution[i], best_solution[j]
-        if zoning_check(task_a, task_b):  # Check zoning constraints
-            positive_zoning += 1
-        else:
-            negative_zoning += 1
-
-    total_zoning = positive_zoning + negative_zoning
+    positive_zoning = instance.zoning_index.count_zoned_pairs(best_solution)
+    negative_zoning = len(best_solution) * (len(best_solution) - 1) // 2 - positive_zoning
 
-    total_tasks_checked = main.total_tasks * (main.total_tasks - 1) // 2
+    total_tasks_checked = instance.total_tasks * (instance.total_tasks - 1) // 2
     positive_zoning_percentage = (positive_zoning / total_tasks_checked) * 100
     negative_zoning_percentage = (negative_zoning / total_tasks_checked) * 100
 
-    print("Cycle time:", cycle_time)
-    print("Positive Zoning Satisfaction Percentage:", positive_zoning_percentage)
-    print("Negative Zoning Satisfaction Percentage:", negative_zoning_percentage)
-
-     # Save results for graphing
-    main.folder_results.append({
-        'folder': os.path.basename(folder_path),
+    log("Cycle time:", cycle_time)
+    if solver != 'exact':
+        log(f"Stopped after {stopping.generations} generations: {stopping.summary()['stop_reason']}")
+    log("Positive Zoning Satisfaction Percentage:", positive_zoning_percentage)
+    log("Negative Zoning Satisfaction Percentage:", negative_zoning_percentage)
+
+    # Results for graphing
+    start_times = np.concatenate(([0], np.cumsum(instance.processing_times)[:-1]))
+    result = {
+        'folder': instance.name,
+        'seed': seed,
         'cycle_time': cycle_time,
+        'best_solution': best_solution.tolist(),
         'positive_zoning_percentage': positive_zoning_percentage,
         'negative_zoning_percentage': negative_zoning_percentage,
         'task_assignments': [
-            {'task': i + 1, 'start': sum(main.processing_times[:i]), 'duration': main.processing_times[i],
-             'station': best_solution[i]} for i in range(main.total_tasks)
+            {'task': i + 1, 'start': start_times[i], 'duration': instance.processing_times[i],
+             'station': best_solution[i]} for i in range(instance.total_tasks)
         ]
-    })
-
-    # Validate Line 1
-    line1_respects = validate_solution(solution=best_solution,
-                                      precedence_constraints=main.precedence_constraints_line1,
-                                      tasks_line_start=0, tasks_line_end=9,
-                                      offset=0)
-
-    # Validate Line 2
-    line2_respects = validate_solution(solution=best_solution,
-                                      precedence_constraints=main.precedence_constraints_line2,
-                                      tasks_line_start=9, tasks_line_end=17,
-                                      offset=9)
-
-    if line1_respects and line2_respects:
-        print("Solution respects all precedence constraints.\n")
-        print("------------------------------------------------")
+    }
+    if solver != 'exact':
+        result.update(stopping.summary())
+    if exact_result is not None:
+        result.update(solver=solver, optimal=exact_result['optimal'], lower_bound=exact_result['lower_bound'],
+                      gap=exact_result['gap'], exact_nodes=exact_result['nodes'], exact_time=exact_result['elapsed_time'])
+        if ga_solution is not None:
+            result['ga_cycle_time'] = fitness_with_robot(ga_solution, instance.task_times, instance.layout)
+            result['ga_gap'] = optimality_gap(result['ga_cycle_time'], exact_result['lower_bound'])
+            log("GA optimality gap:", result['ga_gap'])
+    else:
+        result['gap'] = optimality_gap(cycle_time, result['lower_bound'])
+    if island_result is not None:
+        result['islands'] = island_result['islands']
+    if telemetry is not None:
+        result['telemetry'] = telemetry.summary()
+    if solver != 'exact' and island_result is None and fitness_cache is not None and not incremental:
+        result['fitness_cache'] = fitness_cache.stats()
+        log("Fitness cache:", result['fitness_cache'])
+
+    # Validate each line against its own segment of the solution, whatever the line lengths
+    line1_respects = instance.precedence_index_line1.respects(best_solution)
+    line2_respects = instance.precedence_index_line2.respects(best_solution)
+    result['respects_precedence'] = line1_respects and line2_respects
+    if instance.station_mask is not None:
+        result['respects_stations'] = bool(instance.station_mask[np.arange(instance.total_tasks), best_solution].all())
+
+    if result['respects_precedence']:
+        log("Solution respects all precedence constraints.\n")
+        log("------------------------------------------------")
     else:
-        print("Solution violates precedence constraints.\n")
-        print("------------------------------------------------")
\ No newline at end of file
+        for line, respects in ((1, line1_respects), (2, line2_respects)):
+            if not respects:
+                log(f"Precedence violated on line {line}\n")
+        log("Solution violates precedence constraints.\n")
+        log("------------------------------------------------")
+    if not result.get('respects_stations', True):
+        log("Solution assigns tasks to stations that do not serve their line.\n")
+
+    return result
@@ -0,0 +1,97 @@
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from contextlib import contextmanager, nullcontext
+import numpy as np
+
+_NO_TIMING = nullcontext()
+
+# Accumulated wall time per GA stage plus event counters
+class StageTimer:
+    def __init__(self):
+        self.stage_times = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Per-generation hook; plain timers ignore it
+    def record_generation(self, generation, population, fitness_scores):
+        pass
+
+# Context manager timing one stage, a shared no-op when timing is disabled
+def stage(timer, name):
+    return _NO_TIMING if timer is None else timer.stage(name)
+
+# Generation-level telemetry: stage timers and counters plus best/mean fitness and diversity per
+# generation, emitted as events to a callback and/or as JSON lines. Runs appended to the same file are told
+# apart by the run_id and start time every event carries
+class GATelemetry(StageTimer):
+    def __init__(self, callback=None, jsonl_path=None, context=None):
+        super().__init__()
+        self.callback = callback
+        self.jsonl_file = open(jsonl_path, 'a') if jsonl_path else None
+        self.context = dict(run_id=uuid.uuid4().hex[:12], started=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        self.context.update(context or {})
+        self.generations = []
+        self._last_stage_times = {}
+        self._last_counters = {}
+
+    def record_generation(self, generation, population, fitness_scores):
+        stage_times = {name: total - self._last_stage_times.get(name, 0.0) for name, total in self.stage_times.items()}
+        counters = {name: total - self._last_counters.get(name, 0) for name, total in self.counters.items()}
+        self._last_stage_times = dict(self.stage_times)
+        self._last_counters = dict(self.counters)
+        self.emit(dict(self.context, event='generation', generation=generation,
+                       best_fitness=float(np.min(fitness_scores)), mean_fitness=float(np.mean(fitness_scores)),
+                       **population_diversity(population), stage_times=stage_times, counters=counters))
+
+    # Totals of the whole run
+    def summary(self):
+        return dict(self.context, event='summary', generations=len(self.generations),
+                    stage_times=dict(self.stage_times), counters=dict(self.counters))
+
+    def emit(self, event):
+        if event['event'] == 'generation':
+            self.generations.append(event)
+        if self.callback is not None:
+            self.callback(event)
+        if self.jsonl_file is not None:
+            self.jsonl_file.write(json.dumps(event) + '\n')
+
+    def close(self):
+        self.emit(self.summary())
+        if self.jsonl_file is not None:
+            self.jsonl_file.close()
+            self.jsonl_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Share of distinct individuals and mean pairwise Hamming distance per task (0 when converged)
+def population_diversity(population):
+    population = np.asarray(population)
+    pop_size = len(population)
+    if pop_size < 2:
+        return {'unique_fraction': 1.0, 'diversity': 0.0}
+    unique_fraction = len(np.unique(population, axis=0)) / pop_size
+
+    # Per task, the share of ordered pairs of individuals that disagree
+    offsets = population.max() + 1
+    flat = (population + offsets * np.arange(population.shape[1])).ravel()
+    counts = np.bincount(flat, minlength=offsets * population.shape[1]).reshape(population.shape[1], offsets)
+    agreeing_pairs = (counts * (counts - 1)).sum(axis=1)
+    diversity = 1.0 - agreeing_pairs / (pop_size * (pop_size - 1))
+    return {'unique_fraction': unique_fraction, 'diversity': float(diversity.mean())}
@@ -0,0 +1,30 @@
+import asyncio
+import inspect
+from batch_runner import solve_batch
+from process_each_folder import solve_instance
+
+SOLVE_OPTIONS = tuple(name for name in inspect.signature(solve_instance).parameters
+                      if name not in ('instance', 'seed', 'verbose'))
+
+# Re-entrant solver API: the options are fixed at construction and every solve keeps its state (RNG, caches,
+# stopping criteria, station assignments) to itself, so one Solver can serve several threads or asyncio
+# tasks at once. Results are the dicts of solve_instance: cycle time, best solution, zoning percentages,
+# task assignments and the stop reason, plus solver-specific details
+class Solver:
+    def __init__(self, verbose=False, **options):
+        unknown = sorted(set(options) - set(SOLVE_OPTIONS))
+        if unknown:
+            raise TypeError(f"Unknown solver options: {', '.join(unknown)}")
+        self.options = options
+        self.verbose = verbose
+
+    def solve(self, instance, seed=None):
+        return solve_instance(instance, seed=seed, verbose=self.verbose, **self.options)
+
+    # Solve in a worker thread without blocking the event loop
+    async def solve_async(self, instance, seed=None):
+        return await asyncio.to_thread(self.solve, instance, seed)
+
+    # Solve many instances in a process pool (max_workers=1: serially here); results keep the input order
+    def solve_many(self, instances, max_workers=None, seed=None):
+        return solve_batch(instances, max_workers, seed, verbose=self.verbose, **self.options)
@@ -0,0 +1,93 @@
+import json
+import numpy as np
+
+ROBOT_SPEED_FACTOR = 0.7  # Default speed-up of a mixed (worker and robot) station
+
+# Stations of the two parallel lines as compact arrays: the robot speed factor of every station (1 for
+# worker-only) and which lines it serves. It behaves as the sequence of its speed factors, so it can be
+# passed wherever the fitness functions take a robot_density
+class StationLayout:
+    def __init__(self, speed_factors, serves=None):
+        self.speed_factors = np.asarray(speed_factors, dtype=float)
+        if self.speed_factors.ndim != 1 or len(self.speed_factors) == 0:
+            raise ValueError("A station layout needs at least one station")
+        if ((self.speed_factors <= 0) | (self.speed_factors > 1)).any():
+            raise ValueError("Speed factors must be in (0, 1]")
+        if serves is None:
+            serves = np.ones((2, len(self.speed_factors)), dtype=bool)
+        self.serves = np.asarray(serves, dtype=bool)  # (line, station)
+        if self.serves.shape != (2, len(self.speed_factors)):
+            raise ValueError("serves needs one row per line and one column per station")
+        if not self.serves.any(axis=1).all():
+            raise ValueError("Every line needs at least one station")
+
+    # Stations shared by both lines, 0 in robot_density meaning worker-only and anything else a robot
+    # working at robot_speed_factor
+    @classmethod
+    def from_robot_density(cls, robot_density, robot_speed_factor=ROBOT_SPEED_FACTOR):
+        return cls(np.where(np.asarray(robot_density) == 0, 1.0, robot_speed_factor))
+
+    # Stations listed by speed factor: shared by both lines first, then those of line 1 only, then line 2 only
+    @classmethod
+    def from_lines(cls, line1=(), line2=(), shared=()):
+        speed_factors = list(shared) + list(line1) + list(line2)
+        n_shared, n_line1 = len(shared), len(line1)
+        serves = np.zeros((2, len(speed_factors)), dtype=bool)
+        serves[:, :n_shared] = True
+        serves[0, n_shared:n_shared + n_line1] = True
+        serves[1, n_shared + n_line1:] = True
+        return cls(speed_factors, serves)
+
+    def __len__(self):
+        return len(self.speed_factors)
+
+    def __iter__(self):
+        return iter(self.speed_factors.tolist())
+
+    # True when some station serves only one of the lines
+    @property
+    def restricts_lines(self):
+        return not self.serves.all()
+
+    # Mask (n_tasks, n_stations) of the stations each task may be assigned to
+    def station_mask(self, tasks_nt1, total_tasks):
+        line_of_task = (np.arange(total_tasks) >= tasks_nt1).astype(int)
+        return self.serves[line_of_task]
+
+    # robot_density view of the layout: 0 for worker-only stations, 1 for stations with a robot
+    def robot_density(self):
+        return [0 if factor == 1.0 else 1 for factor in self.speed_factors]
+
+# Station-dependent task times for tasks that a robot cannot assist (robot_eligible False): the time
+# scaled so that the station's speed factor gives back the full manual time. None when every task is eligible
+def task_times_matrix(processing_times, layout, robot_eligible=None):
+    if robot_eligible is None or np.all(robot_eligible):
+        return None
+    processing_times = np.asarray(processing_times, dtype=float)
+    times = np.tile(processing_times[:, np.newaxis], (1, len(layout)))
+    manual = ~np.asarray(robot_eligible, dtype=bool)
+    times[manual] /= layout.speed_factors
+    return times
+
+# Per-task robot eligibility from the 1-based numbers of the tasks a robot cannot assist (line 1 tasks first,
+# then line 2, as in ProblemInstance); None when there are none
+def robot_eligibility(total_tasks, worker_only_tasks=None):
+    if not worker_only_tasks:
+        return None
+    worker_only_tasks = np.asarray(worker_only_tasks, dtype=int)
+    if ((worker_only_tasks < 1) | (worker_only_tasks > total_tasks)).any():
+        raise ValueError(f"Worker-only tasks must be numbered 1 to {total_tasks}")
+    robot_eligible = np.ones(total_tasks, dtype=bool)
+    robot_eligible[worker_only_tasks - 1] = False
+    return robot_eligible
+
+# Layout file: speed factors per station under "shared", "line1" and "line2" (1 for worker-only), plus the
+# optional "worker_only_tasks"; returns the StationLayout and the worker-only task numbers
+def load_layout(path):
+    with open(path) as f:
+        spec = json.load(f)
+    unknown = sorted(set(spec) - {'shared', 'line1', 'line2', 'worker_only_tasks'})
+    if unknown:
+        raise ValueError(f"Unknown layout keys: {', '.join(unknown)}")
+    layout = StationLayout.from_lines(spec.get('line1', ()), spec.get('line2', ()), spec.get('shared', ()))
+    return layout, spec.get('worker_only_tasks', [])
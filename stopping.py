@@ -0,0 +1,58 @@
+import time
+import numpy as np
+from ga_algo import cycle_time_lower_bound
+
+STOP_REASONS = ('max_generations', 'stagnation', 'lower_bound', 'target_cycle_time', 'time_limit')
+
+# Convergence-aware stopping for the GA loop: no improvement for stagnation_generations generations,
+# the best cycle time reaching target_cycle_time or the instance's lower bound, or time_limit seconds
+# of wall time. Criteria left as None are off; the generation limit always applies
+class StoppingCriteria:
+    def __init__(self, stagnation_generations=None, target_cycle_time=None, time_limit=None, stop_at_lower_bound=False,
+                 tolerance=1e-9):
+        self.stagnation_generations = stagnation_generations
+        self.target_cycle_time = target_cycle_time
+        self.time_limit = time_limit
+        self.stop_at_lower_bound = stop_at_lower_bound
+        self.tolerance = tolerance
+        self.start()
+
+    # Reset for a new run; the clock starts here, so the budget covers initialization too
+    def start(self, instance=None):
+        self.start_time = time.perf_counter()
+        self.lower_bound = None
+        if instance is not None:
+            self.lower_bound = cycle_time_lower_bound(instance.task_times, instance.layout)
+        self.best_fitness = np.inf
+        self.stale_generations = 0
+        self.generations = 0
+        self.reason = None
+
+    # Record the scores of one evaluated generation (or several, for island epochs); True when the run should stop
+    def update(self, fitness_scores, generations=1):
+        self.generations += generations
+        best = float(np.min(fitness_scores))
+        if best < self.best_fitness - self.tolerance:
+            self.best_fitness = best
+            self.stale_generations = 0
+        else:
+            self.stale_generations += generations
+
+        if self.stop_at_lower_bound and self.lower_bound is not None and best <= self.lower_bound + self.tolerance:
+            self.reason = 'lower_bound'
+        elif self.target_cycle_time is not None and best <= self.target_cycle_time + self.tolerance:
+            self.reason = 'target_cycle_time'
+        elif self.stagnation_generations is not None and self.stale_generations >= self.stagnation_generations:
+            self.reason = 'stagnation'
+        elif self.time_limit is not None and time.perf_counter() - self.start_time >= self.time_limit:
+            self.reason = 'time_limit'
+        return self.reason is not None
+
+    def summary(self):
+        return {
+            'stop_reason': self.reason or 'max_generations',
+            'generations_run': self.generations,
+            'elapsed_time': time.perf_counter() - self.start_time,
+            'best_fitness': self.best_fitness,
+            'lower_bound': self.lower_bound
+        }
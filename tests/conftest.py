@@ -0,0 +1,33 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dataset_loader import iter_zip_instances
+from station_layout import StationLayout, robot_eligibility
+
+SMALL_ZIP = os.path.join(ROOT, 'PALBP_DATASET', 'PALBP_DATASET', 'small', 'PALBP-data-sets.zip')
+
+# Every instance of the small sets, parsed once per test session
+@pytest.fixture(scope='session')
+def small_instances():
+    if not os.path.exists(SMALL_ZIP):
+        pytest.skip("small PALBP dataset ZIP not available")
+    return list(iter_zip_instances(SMALL_ZIP))
+
+# Station layouts the solver tests run under: the default three shared stations, per-station speed factors,
+# and stations per line with every third task worker-only
+LAYOUTS = {
+    'default': lambda instance: instance,
+    'speed_factors': lambda instance: instance.with_layout(StationLayout([1.0, 0.6, 0.8])),
+    'per_line': lambda instance: instance.with_layout(
+        StationLayout.from_lines(line1=[1.0], line2=[0.8], shared=[0.7, 0.6]),
+        robot_eligibility(instance.total_tasks, range(1, instance.total_tasks + 1, 3))),
+}
+
+# Function putting an instance under each of the LAYOUTS in turn
+@pytest.fixture(params=sorted(LAYOUTS))
+def layout(request):
+    return LAYOUTS[request.param]
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from exact_solver import branch_and_bound
+from ga_algo import robot_factors, task_station_times
+
+# Distinct station-load vectors of every feasible assignment of one line, by exhaustive enumeration
+def line_loads(instance, index):
+    n_stations = instance.number_of_stations
+    tasks = np.arange(index.tasks_line_start, index.tasks_line_end)
+    labels = np.indices((n_stations,) * len(tasks)).reshape(len(tasks), -1).T
+    solutions = np.zeros((len(labels), instance.total_tasks), dtype=int)
+    solutions[:, tasks] = labels
+    feasible = index.respects_population(solutions)
+    if instance.station_mask is not None:
+        feasible &= instance.station_mask[tasks, labels].all(axis=1)
+    labels = labels[feasible]
+    times = task_station_times(instance.task_times, tasks[np.newaxis, :], labels)
+    flat_stations = (labels + n_stations * np.arange(len(labels))[:, np.newaxis]).ravel()
+    loads = np.bincount(flat_stations, weights=times.ravel(), minlength=n_stations * len(labels))
+    return np.unique(loads.reshape(len(labels), n_stations).round(9), axis=0)
+
+# Optimal cycle time by exhaustive search: the lines are independent apart from the shared station loads
+def brute_force_cycle_time(instance):
+    factors = robot_factors(instance.layout)
+    loads1 = line_loads(instance, instance.precedence_index_line1)
+    loads2 = line_loads(instance, instance.precedence_index_line2)
+    return min(((load1 + loads2) * factors).max(axis=1).min() for load1 in loads1)
+
+@pytest.mark.parametrize('name', ['mertens', 'BOWMAN', 'jaeschke'])
+def test_branch_and_bound_is_optimal(small_instances, name, layout):
+    instance = layout(next(instance for instance in small_instances if instance.name == name))
+    result = branch_and_bound(instance)
+    assert result['optimal']
+    assert result['cycle_time'] == pytest.approx(brute_force_cycle_time(instance))
+    assert result['lower_bound'] <= result['cycle_time'] + 1e-9
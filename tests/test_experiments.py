@@ -0,0 +1,25 @@
+import json
+import pytest
+import experiments
+from experiments import drop_partial_line, load_results, run_cell
+
+def test_resume_after_partial_line(tmp_path):
+    results_path = tmp_path / 'results.jsonl'
+    complete = json.dumps({'cell': 'a', 'cycle_time': 1.0}) + '\n'
+    results_path.write_text(complete + '{"cell": "b", "cycle')
+    assert [result['cell'] for result in load_results(str(results_path))] == ['a']
+
+    drop_partial_line(str(results_path))
+    with open(results_path, 'a') as f:
+        f.write(json.dumps({'cell': 'c', 'cycle_time': 2.0}) + '\n')
+    assert [result['cell'] for result in load_results(str(results_path))] == ['a', 'c']
+
+def test_run_cell_records_only_rejected_configs(small_instances, monkeypatch):
+    instance = small_instances[0]
+    assert 'ValueError' in run_cell(instance, {'tournament_size': 20, 'pop_size': 4, 'generations': 2}, 0)['error']
+
+    def broken_solve(*args, **kwargs):
+        raise IndexError("solver bug")
+    monkeypatch.setattr(experiments, 'solve_instance', broken_solve)
+    with pytest.raises(IndexError):
+        run_cell(instance, {'generations': 2}, 0)
@@ -0,0 +1,39 @@
+import random
+import numpy as np
+from ga_algo import (cycle_times_from_loads, evolve_generation, initial_population, station_loads_population,
+                     single_point_crossover_with_precedence, swap_mutation_with_precedence)
+
+# The loads carried through crossover, mutation and zoning repair equal a full recomputation every generation
+def test_incremental_loads_match_recomputation(small_instances, layout):
+    rng = random.Random(0)
+    for instance in small_instances:
+        instance = layout(instance).with_random_station_assignments(rng)
+        population = initial_population(instance, 20, rng=rng)
+        station_loads = station_loads_population(population, instance.task_times, instance.number_of_stations)
+        for _ in range(30):
+            fitness_scores = cycle_times_from_loads(station_loads, instance.layout)
+            population, station_loads = evolve_generation(instance, population, fitness_scores, station_loads,
+                                                          mutation_rate=0.5, rng=rng)
+            np.testing.assert_allclose(
+                station_loads, station_loads_population(population, instance.task_times, instance.number_of_stations),
+                err_msg=instance.name)
+
+# Each operator's load update on its own: zoning repair, which recomputes the rows it changes, is left out
+def test_operator_load_updates_match_recomputation(small_instances, layout):
+    rng = random.Random(1)
+    for instance in small_instances:
+        instance = layout(instance).with_random_station_assignments(rng)
+        population = initial_population(instance, 20, rng=rng)
+        loads = station_loads_population(population, instance.task_times, instance.number_of_stations)
+        indices = (instance.precedence_index_line1, instance.precedence_index_line2)
+        for _ in range(200):
+            i, j = rng.sample(range(len(population)), 2)
+            child1, child2, loads1, loads2 = single_point_crossover_with_precedence(
+                population[i], population[j], *indices, (loads[i], loads[j]), instance.task_times, rng=rng)
+            child1, loads1 = swap_mutation_with_precedence(child1, *indices, station_loads=loads1,
+                                                           processing_times=instance.task_times, rng=rng,
+                                                           station_mask=instance.station_mask)
+            population[i], population[j], loads[i], loads[j] = child1, child2, loads1, loads2
+            np.testing.assert_allclose(
+                loads, station_loads_population(population, instance.task_times, instance.number_of_stations),
+                err_msg=instance.name)
@@ -0,0 +1,24 @@
+import pickle
+import numpy as np
+from conftest import SMALL_ZIP
+from instance_cache import iter_cached_instances
+
+def test_cached_instances_match_and_stay_mapped(small_instances, tmp_path):
+    cached = {instance.name: instance for instance in iter_cached_instances(SMALL_ZIP, str(tmp_path))}
+    for instance in small_instances:
+        mapped = cached[instance.name]
+        np.testing.assert_array_equal(mapped.processing_times, instance.processing_times)
+        assert mapped.tasks_nt1 == instance.tasks_nt1
+        assert mapped.precedence_constraints_line1 == instance.precedence_constraints_line1
+        assert mapped.precedence_constraints_line2 == instance.precedence_constraints_line2
+
+        # Worker processes receive file names and map the same pages again
+        unpickled = pickle.loads(pickle.dumps(mapped))
+        for array in (unpickled.processing_times, unpickled.precedence_index_line1.edges,
+                      unpickled.precedence_index_line2.edges, unpickled.zoning_index.swap):
+            assert isinstance(array, np.memmap)
+
+        # Another layout shares the arrays and precedence indices
+        relaid = mapped.with_stations(4, [0, 1, 1, 1])
+        assert relaid.processing_times is mapped.processing_times
+        assert relaid.precedence_index_line1 is mapped.precedence_index_line1
@@ -0,0 +1,16 @@
+import numpy as np
+from ga_algo import station_loads_population, steepest_descent
+from problem_instance import ProblemInstance
+
+# Two stations tie for the highest load: no single move lowers the cycle time, but moving a task to the idle
+# station flattens the loads, after which the other bottleneck can be relieved
+def test_steepest_descent_progresses_from_tied_bottleneck():
+    instance = ProblemInstance('tied', [], [], [4, 2], [4, 2], robot_density=(0, 0, 0))
+    individual = np.array([0, 0, 1, 1])
+    loads = station_loads_population(individual[np.newaxis, :], instance.task_times, instance.number_of_stations)[0]
+    np.testing.assert_array_equal(loads, [6, 6, 0])
+
+    improved, improved_loads, _ = steepest_descent(instance, individual, loads)
+    assert improved_loads.max() == 4
+    np.testing.assert_array_equal(
+        improved_loads, station_loads_population(improved[np.newaxis, :], instance.task_times, 3)[0])
@@ -0,0 +1,23 @@
+import random
+import numpy as np
+from ga_algo import initial_population, respects_both_lines
+
+# Every task x station move of the MoveIndex mask agrees with a full precedence re-check of the moved
+# individual, for feasible individuals (e.g. the GA's) and arbitrary ones
+def test_feasible_moves_match_full_recheck(small_instances):
+    rng = random.Random(0)
+    np_rng = np.random.default_rng(0)
+    for instance in small_instances:
+        for n_stations in (3, 5):
+            instance_k = instance.with_stations(n_stations, [0] + [1] * (n_stations - 1)).with_random_station_assignments(rng)
+            individuals = list(initial_population(instance_k, 10, rng=rng))
+            individuals += list(np_rng.integers(0, n_stations, size=(10, instance.total_tasks)))
+            indices = (instance_k.precedence_index_line1, instance_k.precedence_index_line2)
+            tasks = np.arange(instance.total_tasks)
+            for individual in individuals:
+                feasible = instance_k.move_index.feasible_moves(individual, tasks)
+                moved = np.repeat(np.tile(individual, (n_stations, 1))[np.newaxis], len(tasks), axis=0)
+                moved[tasks, :, tasks] = np.arange(n_stations)
+                expected = respects_both_lines(moved.reshape(-1, instance.total_tasks), *indices).reshape(len(tasks), n_stations)
+                expected[tasks, individual] = False  # Staying put is not a move
+                np.testing.assert_array_equal(feasible, expected, err_msg=instance.name)
@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+from file_handles import (parse_precedence_text, parse_precedence_lines, parse_processing_times_text,
+                          parse_processing_times_lines)
+
+@pytest.mark.parametrize('text', ['1 2\n2 3\n', '"1" "2"\n\n3 4', '1 2 3\n4\n', '1\n2 3\n', '1 x\n2 3\n', ''])
+def test_precedence_bulk_parse_matches_line_parser(text):
+    assert parse_precedence_text(text, 'test') == parse_precedence_lines(text.splitlines(), 'test')
+
+@pytest.mark.parametrize('text', ['3\n4\n5', '"3"\n4\n', '1 2\n\n', '1\n\n2\n', '3\nx\n', ''])
+def test_processing_times_bulk_parse_matches_line_parser(text):
+    np.testing.assert_array_equal(parse_processing_times_text(text, 'test'),
+                                  np.array(parse_processing_times_lines(text.splitlines(), 'test'), dtype=np.int64))
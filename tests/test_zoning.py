@@ -0,0 +1,45 @@
+import numpy as np
+from process_each_folder import solve_instance
+from ga_algo import apply_zoning_constraints, repair_zoning_population
+
+# Positive zoning pairs of a solution counted pair by pair, as process_folder did before ZoningIndex
+def zoned_pairs_by_loop(solution, instance):
+    constraints = instance.precedence_constraints_line1 + instance.precedence_constraints_line2
+    positive_zoning = 0
+    for i in range(len(solution)):
+        for j in range(i + 1, len(solution)):
+            task_a, task_b = solution[i], solution[j]
+            if (task_a, task_b) in constraints or (task_b, task_a) in constraints:
+                positive_zoning += 1
+    return positive_zoning
+
+def random_population(instance, rng, pop_size=20):
+    return rng.integers(0, instance.zoning_index.size, size=(pop_size, instance.total_tasks))
+
+def test_repair_matches_apply_zoning_constraints(small_instances):
+    rng = np.random.default_rng(0)
+    for instance in small_instances:
+        population = random_population(instance, rng)
+        expected = apply_zoning_constraints(population.copy(), instance.precedence_constraints_line1,
+                                            instance.precedence_constraints_line2, instance.tasks_nt1)
+        repaired = repair_zoning_population(population.copy(), instance.zoning_index)
+        np.testing.assert_array_equal(repaired, np.asarray(expected), err_msg=instance.name)
+
+def test_count_zoned_pairs_matches_pair_loop(small_instances):
+    rng = np.random.default_rng(1)
+    for instance in small_instances:
+        for solution in random_population(instance, rng, pop_size=5):
+            assert instance.zoning_index.count_zoned_pairs(solution) == zoned_pairs_by_loop(solution.tolist(), instance), \
+                instance.name
+
+def test_zoning_index_is_sized_up_front_and_never_grown(small_instances):
+    instance = min(small_instances, key=lambda instance: instance.total_tasks)
+    n_stations = instance.total_tasks + 5
+    relaid = instance.with_stations(n_stations, [0] + [1] * (n_stations - 1))
+    assert relaid.zoning_index is not instance.zoning_index
+    assert relaid.zoning_index.size >= n_stations
+    assert instance.zoning_index.size == instance.total_tasks + 1
+
+    zoned, swap = relaid.zoning_index.zoned, relaid.zoning_index.swap
+    solve_instance(relaid, generations=5, seed=0, verbose=False)
+    assert relaid.zoning_index.zoned is zoned and relaid.zoning_index.swap is swap